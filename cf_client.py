@@ -0,0 +1,118 @@
+import time, random, threading
+
+API_URL = "https://codeforces.com/api/"
+
+# Codeforces answers these with "FAILED" when we are going too fast,
+# they are worth another try after backing off.
+RETRYABLE_COMMENTS = ("Call limit exceeded",)
+
+
+class TokenBucket:
+	"""Thread-safe token bucket, callers block in acquire() until a token is free"""
+	def __init__(self, rate, capacity=1):
+		self.rate = rate
+		self.capacity = capacity
+		self.tokens = capacity
+		self.last = time.monotonic()
+		self.lock = threading.Lock()
+
+	def acquire(self):
+		with self.lock:
+			now = time.monotonic()
+			self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+			self.last = now
+			# Take the token even if it goes negative, so concurrent callers
+			# queue up behind each other instead of all waking at once.
+			self.tokens -= 1
+			wait = -self.tokens / self.rate if self.tokens < 0 else 0
+		if wait:
+			time.sleep(wait)
+
+
+class CFClient:
+	"""Pooled Codeforces API client with timeouts, retries and a shared rate limit"""
+	def __init__(self, timeout=(5, 20), retries=3, backoff=1.0, min_interval=2.0):
+		self.timeout = timeout
+		self.retries = retries
+		self.backoff = backoff
+		self.limiter = TokenBucket(rate=1 / min_interval)
+
+		self.session = None
+		self.lock = threading.Lock()
+		self.counters = {"calls": 0, "failures": 0, "retries": 0, "latency_total": 0.0, "latency_max": 0.0}
+
+	def get_session(self):
+		# requests is the slowest import of the app, so it waits for the first API call
+		with self.lock:
+			if self.session is None:
+				import requests
+				from requests.adapters import HTTPAdapter
+				self.session = requests.Session()
+				self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+			return self.session
+
+	def record(self, key, latency=None):
+		with self.lock:
+			self.counters[key] += 1
+			if latency is not None:
+				self.counters["latency_total"] += latency
+				self.counters["latency_max"] = max(self.counters["latency_max"], latency)
+
+	def stats(self):
+		with self.lock:
+			snapshot = dict(self.counters)
+		snapshot["latency_avg"] = snapshot["latency_total"] / snapshot["calls"] if snapshot["calls"] else 0.0
+		return snapshot
+
+	def sleep_backoff(self, attempt):
+		delay = self.backoff * (2 ** attempt)
+		time.sleep(random.uniform(0, delay))
+
+	def get(self, url, params=None, timeout=None, decode=None):
+		"""GET url under the shared rate limit, retrying connection errors, 429 and 5xx.
+		Returns decode(response), the body text by default; decode raising ValueError, or
+		an HTTPError without a response, retries too. Other HTTP errors, e.g. a 404, are raised at once."""
+		import requests
+		session = self.get_session()
+		last_error = None
+		for attempt in range(self.retries + 1):
+			if attempt:
+				self.record("retries")
+				self.sleep_backoff(attempt)
+
+			self.limiter.acquire()
+			start = time.monotonic()
+			try:
+				resp = session.get(url, params=params, timeout=timeout or self.timeout)
+				self.record("calls", time.monotonic() - start)
+				if resp.status_code == 429 or resp.status_code >= 500:
+					raise requests.HTTPError(f"{resp.status_code} from {url}", response=resp)
+				if decode is None:
+					resp.raise_for_status()
+					return resp.text
+				return decode(resp)
+			except requests.HTTPError as e:
+				self.record("failures")
+				if e.response is not None and e.response.status_code != 429 and e.response.status_code < 500:
+					raise
+				last_error = e
+			except (requests.ConnectionError, requests.Timeout, ValueError) as e:
+				self.record("failures")
+				last_error = e
+
+		raise last_error
+
+	def call(self, method, params=None, timeout=None):
+		"""Call an API method and return the decoded JSON body, including "FAILED" ones"""
+		import requests
+
+		def decode(resp):
+			data = resp.json()
+			if data.get("status") != "OK" and data.get("comment", "").startswith(RETRYABLE_COMMENTS):
+				raise requests.HTTPError(data["comment"])
+			return data
+
+		return self.get(API_URL + method, params, timeout, decode)
+
+
+cf_client = CFClient()
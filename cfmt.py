@@ -1,17 +1,34 @@
-import os.path, json, subprocess, re, requests, stat, time
-from fileinput import filename
+import os.path, json, re, threading
+from concurrent.futures import ThreadPoolExecutor
+from contest_cache import contest_cache
+from cf_client import cf_client
+from submission_index import submission_index
+from git_worker import get_git_worker, flush_git_workers
+from contest_scheduler import contest_scheduler
+from contest_queue import contest_queue
+from compile_cache import compile_cache, binary_path
+from harness import run_solution, judge_test, results_table, solution_command, DISPLAY_CAP_KB
+from git_env import git_env
+from repo_clone import clone_repo, CLONE_MODES
+from solution_layout import solution_path, repo_relative, problem_id
+from contest_mode import prepare_contest, warm_builds
+from samples import sample_fetcher
+from stress import stress, build_command
+from complexity import profile, MAX_N
 
 USER_CONFIG_FILE = "user_config.json"
-CONTEST_QUEUE_FILE = "contest_queue.json"
 
 
 # input sanitation
-def get_valid_prob_id():
+def get_valid_prob_id(allow_contest=False):
     while True:
-        probId = input('Problem ID: (eg. 2160B): ').strip()
+        prompt = "Problem ID: (eg. 2160B, or 'start contest 2160'): " if allow_contest else "Problem ID: (eg. 2160B): "
+        probId = input(prompt).strip()
         if not probId:
             print("Problem ID mustn't be empty.")
             continue
+        if allow_contest and re.match(r'^start contest [0-9]+$', probId):
+            return probId
         if not re.match(r'^[0-9]+[A-Z][1-9]*$', probId):
             print("This doesn't look like a valid problem ID.")
             continue
@@ -56,7 +73,13 @@ def get_valid_cf_username():
         if not handle:
             print("Codeforces username mustn't be empty.")
             continue
-        data = requests.get(f"https://codeforces.com/api/user.info?handles={handle}&checkHistoricHandles=False").json()
+        import requests
+        try:
+            data = cf_client.call("user.info", {"handles": handle, "checkHistoricHandles": "False"})
+        except (requests.RequestException, ValueError) as e:
+            # ValueError: the answer wasn't JSON, e.g. a proxy or maintenance page
+            print(f"Couldn't reach Codeforces: {e}")
+            continue
         if data["status"] == 'OK':
             return handle
         else:
@@ -83,6 +106,15 @@ def validate_user_config(cfg):
     return all(k in cfg and isinstance(cfg[k], str) for k in required_keys)
 
 
+def get_clone_mode():
+    while True:
+        mode = input("Clone mode - 'full', 'partial' (file contents fetched on demand) or "
+                     "'shallow' (partial, recent history only) [full]: ").strip().lower() or "full"
+        if mode in CLONE_MODES:
+            return mode
+        print(f"Clone mode must be one of: {', '.join(CLONE_MODES)}")
+
+
 def create_user():
     print("Set up a repository for your Codeforces solutions if you haven't.")
 
@@ -108,19 +140,25 @@ def create_user():
     if os.path.exists(git_repo_name) and os.path.isdir(git_repo_name):
         print(f"{git_repo_name} folder exists in directory, skipping the cloning.")
     else:
-        os.system(f'git clone https://github.com/{github_username}/{git_repo_name}.git')
+        clone_repo(github_username, git_repo_name, get_clone_mode())
 
 
 def open_code_file_with_template(l, p):
     if not os.path.isfile(p):
+        os.makedirs(os.path.dirname(p), exist_ok=True)
         with open(f'{l}_template.txt', 'r') as template, open(p, 'w') as cf_file:
             cf_file.write(template.read())
 
 
 def compile_code(l, p):
     if l == 'cpp':
-        os.system(f'g++ -std=c++14 {p}')
-        print('Compiled Successfully')
+        returncode, output, hit = compile_cache.compile(p)
+        if output:
+            print(output)
+        if returncode == 0:
+            print(f"Compiled Successfully{' (cached)' if hit else ''} [{compile_cache.stats()}]")
+        else:
+            print('Compilation failed!')
     elif l == 'py':
         print('Compilation not needed.')
 
@@ -128,103 +166,161 @@ def compile_code(l, p):
 def run_code(l, p):
     print('input here:')
     if l == 'cpp':
-        os.system('a')
+        os.system(f'"{binary_path(p)}"')
         print()
     elif l == 'py':
         os.system(f"python {p}")
 
 
-def is_git_logged_in():
-    name = subprocess.getoutput("git config --global user.name").strip()
-    email = subprocess.getoutput("git config --global user.email").strip()
-    return bool(name) and bool(email)
+def run_on_file(l, p):
+    path = input("Input file (e.g. made with maxtests.py): ").strip()
+    if not os.path.isfile(path):
+        print(f"{path} doesn't exist.")
+        return
+    # The file becomes the solution's stdin as is, only the start of a huge output is kept
+    result = run_solution(solution_command(l, p), stdin_file=path, display_cap=DISPLAY_CAP_KB * 1024)
+    if result.stdout:
+        print(result.stdout)
+    if result.stderr:
+        print(f"[Error]\n{result.stderr}")
+    print(result.summary())
+
+
+def judge_code(l, p):
+    print('input here (end with an empty line):')
+    lines = []
+    while True:
+        line = input()
+        if not line:
+            break
+        lines.append(line)
 
+    result = run_solution(solution_command(l, p), "\n".join(lines) + "\n")
+    if result.stdout:
+        print(result.stdout)
+    if result.stderr:
+        print(f"[Error]\n{result.stderr}")
+    print(result.summary())
 
-def load_queue():
-    if not os.path.isfile(CONTEST_QUEUE_FILE):
-        return {}
-    with open(CONTEST_QUEUE_FILE, 'r', encoding="utf-8") as f:
-        return json.load(f)
+
+def prefetch_samples(prob_ids):
+    """Fetch samples in the background, so 't' works right away and offline later"""
+    def fetch(pId):
+        try:
+            sample_fetcher.get(pId)
+        except Exception:
+            pass  # 't' retries and reports the error
+
+    for pId in prob_ids:
+        threading.Thread(target=fetch, args=(pId,), daemon=True).start()
+
+
+def test_samples(l, p, pId):
+    try:
+        samples = sample_fetcher.get(pId)
+    except Exception as e:
+        print(f"Couldn't get the samples of {pId}: {e}")
+        return
+    if not samples:
+        print(f"No samples found for {pId}")
+        return
+    # Sequential on purpose, a spawn process pool would re-run this script in every worker
+    results = [judge_test(solution_command(l, p), s["input"], s["expected"]) for s in samples]
+    print(results_table(results))
+
+
+def stress_code(p):
+    gen = input("Generator file (prints a random test for the seed in argv[1]): ").strip()
+    brute = input("Brute force solution file: ").strip()
+    try:
+        gen_cmd, brute_cmd, sol_cmd = (build_command(f) for f in (gen, brute, p))
+    except Exception as e:
+        print(e)
+        return
+    # Threads, not the spawn process pool: spawned workers would re-run this script.
+    # Every case is a subprocess anyway, so threads still keep all cores busy.
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as pool:
+        cases, failure = stress(gen_cmd, brute_cmd, sol_cmd, pool=pool,
+                                on_progress=lambda n, rate: print_flush(f"\r{n} cases, {rate:.1f} cases/s"))
+    print()
+    if failure is None:
+        print(f"{cases} cases passed")
+    elif "error" in failure:
+        print(f"Stress test aborted on seed {failure['seed']}: {failure['error']}")
+    else:
+        print(f"Mismatch after {cases} cases (seed {failure['seed']}): {failure['summary']}\n"
+              f"Input:\n{failure['input']}\nExpected:\n{failure['expected']}\nGot:\n{failure['actual']}")
 
 
-def save_queue(queue):
-    with open(CONTEST_QUEUE_FILE, 'w', encoding="utf-8") as f:
-        json.dump(queue, f, indent=4)
+def estimate_complexity(p):
+    gen = input("Generator file (prints a test of size n, n in argv[1]): ").strip()
+    max_n = input(f"Maximum n from the constraints [{MAX_N}]: ").strip()
+    try:
+        gen_cmd, sol_cmd = build_command(gen), build_command(p)
+        report = profile(gen_cmd, sol_cmd, int(max_n) if max_n else MAX_N,
+                         on_point=lambda n, seconds, kb, verdict: print(f"n = {n}: {seconds:.3f}s {verdict}"))
+    except Exception as e:
+        print(e)
+        return
+    print(report.report())
+
+
+def is_git_logged_in():
+    return git_env.is_logged_in()
 
 
 def contest_time_solve(handle, pId, f):
-    submission_list = requests.get(
-        f"https://codeforces.com/api/user.status?"
-        f"handle={handle}&from={1}&count={15}"
-    ).json()
-
-    contest_list = requests.get(
-        "https://codeforces.com/api/contest.list?gym=false"
-    ).json()
-
-    queue = load_queue()
-
-    for s in submission_list['result']:
-        contestId = f"{s['problem']['contestId']}"
-        problemId = f"{contestId}{s['problem']['index']}"
-        if problemId == pId and (s['verdict'] == 'OK' or s['verdict'] == 'PARTIAL') and s['author']['participantType'] == "CONTESTANT":
-            for c in contest_list['result']:
-                if f"{c['id']}" == contestId:
-                    contest_end = c['startTimeSeconds'] + c['durationSeconds']
-                    if f not in queue:
-                        queue[f] = contest_end
-                        save_queue(queue)
-                    return True
-    return False
+    submission_index.sync(handle)
+    contestId = submission_index.contest_solve(handle, pId)
+    if contestId is None:
+        return False
+
+    contest_end = contest_cache.contest_end(contestId)
+    if contest_end is None:
+        return False
+
+    if contest_queue.enqueue(f, contest_end):
+        contest_scheduler.add(contest_end)
+    return True
+
+
+def print_flush(text):
+    print(text, end="", flush=True)
 
 
 def git_push(f, cf_handle, pId):
     if not contest_time_solve(cf_handle, pId, f):
         print(f"Adding {f} to Git")
-        os.chdir("cf_solves")
-        os.system(f"git add {f}")
-        os.system(f'git commit -m "solved {pId}"')
-
-        print("Pulling latest changes...")
-        os.system("git pull --rebase --autostash")
-
-        print("Pushing to GitHub...")
-        os.system(f"git push origin main")
-        os.chdir("..")
+        worker = get_git_worker(solve_folder)
+        job = worker.submit([f], f"solved {pId}", output_callback=print_flush)
+        if worker.batch_window:
+            print(f"Queued {f}, batched solves are pushed every {worker.batch_window}s and on quit.")
+        else:
+            job.wait()
     else:
         print(f"Added {f} to Contest Queue.\n"
-              f"Queued solutions will be auto pushed to Github on Restart after contest is finished.\n")
+              f"Queued solutions will be auto pushed to Github as soon as the contest is finished.\n")
 
 
 def git_push_queue():
-    curr_time = int(time.time())
-    queue = load_queue()
-    if not queue:
-        return
-
-    ready = []
-    pending = {}
-    for fname, contest_end in queue.items():
-        if curr_time >= contest_end:
-            ready.append(fname)
-        else:
-            pending[fname] = contest_end
-
+    ready = contest_queue.ready()
     if not ready:
         return
 
     print(f"Adding {', '.join(ready)} from contest queue to Git")
 
-    os.chdir(f"{solve_folder}")
-    os.system(f"git add {' '.join(ready)}")
-    os.system(f'git commit -m "solved contest problems '
-              f'{", ".join(prob.split(".")[0] for prob in ready)}"')
-    os.system("git pull --rebase --autostash")
-    os.system("git push origin main")
-    os.chdir("..")
-    print(f"{', '.join(prob.split('.')[0] for prob in ready)} pushed to Github")
+    worker = get_git_worker(solve_folder)
+    job = worker.submit(
+        ready,
+        f'solved contest problems {", ".join(problem_id(prob) for prob in ready)}',
+        output_callback=print_flush
+    )
+    worker.flush()
+    if not job.wait():
+        raise RuntimeError("git push failed")
+    print(f"{', '.join(problem_id(prob) for prob in ready)} pushed to Github")
 
-    save_queue(pending)
+    contest_queue.dequeue(ready)
 
 
 curr_dir = os.path.dirname(os.path.abspath(__file__))
@@ -236,37 +332,92 @@ if user_config is None:
 
 solve_folder = user_config["git_repo_name"]
 cf_handle = user_config["cf_username"]
+get_git_worker(solve_folder, user_config.get("batch_push_seconds", 0))
+git_env.start(solve_folder)
 
 directory = os.path.join(os.getcwd(), f'{solve_folder}/')
 if not os.path.exists(directory):
     os.makedirs(directory)
 
-git_push_queue()
+contest_scheduler.start(contest_queue.contest_ends(), git_push_queue, print_flush)
+
+
+def start_contest(contest_id, lang):
+    """Create every problem of the contest at once, returns {probId: path}"""
+    problems = prepare_contest(contest_id, directory, lang, user_config.get("layout", "flat"))
+    os.system("code " + " ".join(f'"{p}"' for _, p in problems))
+    if lang == 'cpp':
+        threading.Thread(target=warm_builds, args=([p for _, p in problems],), daemon=True).start()
+    prefetch_samples([prob for prob, _ in problems])
+    print(f"{len(problems)} problems ready: {', '.join(prob for prob, _ in problems)}")
+    return dict(problems)
 
-probId = get_valid_prob_id()
-lang = input("Enter language extension: (eg: 'cpp'/'py'): ")
-file = f"{probId}.{lang}"
-path = os.path.join(directory, f"{file}")
-open_code_file_with_template(lang, path)
 
-os.system(f"code {path}")
+contest_files = {}
+while True:
+    probId = get_valid_prob_id(allow_contest=True)
+    lang = input("Enter language extension: (eg: 'cpp'/'py'): ")
+    if not probId.startswith("start contest"):
+        break
+    try:
+        contest_files = start_contest(int(probId.split()[-1]), lang)
+        break
+    except Exception as e:
+        print(f"Couldn't start the contest: {e}")
+
+if contest_files:
+    probId = next(iter(contest_files))
+    path = contest_files[probId]
+else:
+    path = solution_path(directory, probId, lang, user_config.get("layout", "flat"))
+    open_code_file_with_template(lang, path)
+    os.system(f"code {path}")
+    if lang == 'cpp':
+        threading.Thread(target=compile_cache.warm, args=(path,), daemon=True).start()
+    prefetch_samples([probId])
+file = repo_relative(directory, path)
 print("\nTry for no more than 30 minutes...(Check tutorial to understand)\n")
 
 while True:
+    if contest_files:
+        print(f"Current problem: {probId}\n\t-'p' to switch problem")
     if is_git_logged_in():
-        print("\t-'c' to compile code (C++) \n\t-'r' to run code \n\t-'g' for git push \n\t-'q' to quit\n")
+        print("\t-'c' to compile code (C++) \n\t-'r' to run code \n\t-'j' to run with time/memory limits "
+              "\n\t-'t' to run the sample tests \n\t-'s' to stress test against a brute force "
+              "\n\t-'e' to estimate the complexity \n\t-'f' to run on an input file \n\t-'g' for git push "
+              "\n\t-'q' to quit\n")
     else:
-        print("\t-'c' to compile code (C++) \n\t-'r' to run code \n\t-'q' to quit\n")
+        print("\t-'c' to compile code (C++) \n\t-'r' to run code \n\t-'j' to run with time/memory limits "
+              "\n\t-'t' to run the sample tests \n\t-'s' to stress test against a brute force "
+              "\n\t-'e' to estimate the complexity \n\t-'f' to run on an input file \n\t-'q' to quit\n")
     try:
         x = input("Option: ")
         if x.lower() == 'c':
             compile_code(lang, path)
         if x.lower() == 'r':
             run_code(lang, path)
+        if x.lower() == 'j':
+            judge_code(lang, path)
+        if x.lower() == 't':
+            test_samples(lang, path, probId)
+        if x.lower() == 's':
+            stress_code(path)
+        if x.lower() == 'e':
+            estimate_complexity(path)
+        if x.lower() == 'f':
+            run_on_file(lang, path)
         if x.lower() == 'g':
             git_push(file, cf_handle, probId)
+        if x.lower() == 'p' and contest_files:
+            choice = input(f"Problem ({', '.join(contest_files)}): ").strip()
+            if choice in contest_files:
+                probId, path = choice, contest_files[choice]
+                file = repo_relative(directory, path)
+            else:
+                print(f"{choice} isn't a problem of this contest.")
         if x.lower() == 'q':
             print("quitting...\n")
+            flush_git_workers()
             break
     except Exception as e:
         print(e)
\ No newline at end of file
@@ -1,11 +1,31 @@
-import sys, os, subprocess, threading, re, stat, requests, time, json
+import sys, os, subprocess, threading, re, json
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox, simpledialog, filedialog
 import ttkbootstrap as ttk
 from ttkbootstrap.widgets.scrolled import ScrolledText
+from contest_cache import contest_cache
+from cf_client import cf_client
+from submission_index import submission_index
+from git_worker import get_git_worker, flush_git_workers
+from contest_scheduler import contest_scheduler
+from contest_queue import contest_queue
+from compile_cache import compile_cache
+from process_tree import kill_tree
+from log_sink import TkLogSink
+from git_env import git_env
+from repo_clone import clone_repo
+from solution_layout import solution_path, repo_relative, problem_id
+from contest_mode import prepare_contest, create_from_template, warm_builds
+from samples import sample_fetcher
+from stress import stress, build_command, STRESS_CASES
+from complexity import profile, MAX_N
+from harness import (run_solution, run_tests, results_table, solution_command, spill_path, shutdown_test_pool,
+					 TIME_LIMIT, MEMORY_LIMIT_MB, DISPLAY_CAP_KB)
 
 USER_CONFIG_FILE = "user_config.json"
-CONTEST_QUEUE_FILE = "contest_queue.json"
+# Quitting waits at most this long for batched solves to be pushed
+QUIT_PUSH_TIMEOUT = 30
 
 
 def load_user_config():
@@ -27,23 +47,11 @@ def validate_user_config(cfg):
 	return all(k in cfg and isinstance(cfg[k], str) for k in required_keys)
 
 
-def load_queue():
-	if not os.path.isfile(CONTEST_QUEUE_FILE):
-		return {}
-	with open(CONTEST_QUEUE_FILE, "r", encoding="utf-8") as f:
-		return json.load(f)
-
-
-def save_queue(cfg):
-	with open(CONTEST_QUEUE_FILE, "w", encoding="utf-8") as f:
-		json.dump(cfg, f, indent=4)
-
-
 class UserInfoDialog(tk.Toplevel):
 	def __init__(self, parent):
 		super().__init__(parent)
 		self.title("CF Repo Setup")
-		self.geometry("450x300")
+		self.geometry("450x340")
 		self.resizable(False, False)
 		try:
 			self.iconbitmap("codeforces.ico")
@@ -62,6 +70,10 @@ class UserInfoDialog(tk.Toplevel):
 		self.cf_handle_entry = ttk.Entry(self, width=40)
 		self.cf_handle_entry.pack()
 
+		# Large solution repos: blobless, shallow clone with only recent contest folders checked out
+		self.partial_clone = tk.BooleanVar(value=False)
+		ttk.Checkbutton(self, text="Fast clone (large repositories)", variable=self.partial_clone).pack(pady=(10, 0))
+
 		ttk.Button(self, text="OK", command=self.submit).pack(pady=15)
 
 		self.username = None
@@ -95,8 +107,11 @@ class UserInfoDialog(tk.Toplevel):
 	def validate_cf_handle(cf_handle):
 		if not cf_handle:
 			return False, "Coderforces handle mustn't be empty."
-		data = requests.get(
-			f"https://codeforces.com/api/user.info?handles={cf_handle}&checkHistoricHandles=False").json()
+		import requests
+		try:
+			data = cf_client.call("user.info", {"handles": cf_handle, "checkHistoricHandles": "False"})
+		except (requests.RequestException, ValueError) as e:
+			return False, f"Couldn't reach Codeforces: {e}"
 		if data["status"] == 'OK':
 			return True, ""
 		else:
@@ -138,7 +153,7 @@ class UserInfoDialog(tk.Toplevel):
 			else:
 				return
 
-		clone_res = os.system(f"git clone https://github.com/{username}/{reponame}.git")
+		clone_res = clone_repo(username, reponame, "shallow" if self.partial_clone.get() else "full")
 		if clone_res:
 			retry = messagebox.askretrycancel("Repository Not Found\n",
 											  f"Failed to clone github.com/{username}{reponame}\n"
@@ -155,6 +170,40 @@ class UserInfoDialog(tk.Toplevel):
 		self.destroy()
 
 
+class TestCaseDialog(tk.Toplevel):
+	def __init__(self, parent, test_input=""):
+		super().__init__(parent)
+		self.title("Add Test Case")
+		self.geometry("600x500")
+		try:
+			self.iconbitmap("codeforces.ico")
+		except Exception as e:
+			pass
+
+		ttk.Label(self, text="Input:", font=("Segoe UI", 11)).pack(anchor=tk.W, padx=10, pady=(10, 5))
+		self.input_text = ScrolledText(self, height=10, font=("Consolas", 10), autohide=True)
+		self.input_text.insert("1.0", test_input)
+		self.input_text.pack(fill=tk.BOTH, expand=True, padx=10)
+
+		ttk.Label(self, text="Expected Output:", font=("Segoe UI", 11)).pack(anchor=tk.W, padx=10, pady=(10, 5))
+		self.expected_text = ScrolledText(self, height=10, font=("Consolas", 10), autohide=True)
+		self.expected_text.pack(fill=tk.BOTH, expand=True, padx=10)
+
+		ttk.Button(self, text="Add", command=self.submit).pack(pady=10)
+
+		self.test = None
+		self.grab_set()
+
+	def submit(self):
+		test_input = self.input_text.get("1.0", tk.END)
+		expected = self.expected_text.get("1.0", tk.END)
+		if not test_input.strip() or not expected.strip():
+			messagebox.showwarning("Incomplete Test", "Both input and expected output are needed.")
+			return
+		self.test = {"input": test_input, "expected": expected}
+		self.destroy()
+
+
 class GitPushThread(threading.Thread):
 	def __init__(self, file_path, prob_id, solve_folder, cf_handle, output_callback, finished_callback):
 		super().__init__(daemon=True)
@@ -164,35 +213,22 @@ class GitPushThread(threading.Thread):
 		self.cf_handle = cf_handle
 		self.output_callback = output_callback
 		self.finished_callback = finished_callback
+		self.repo_file = repo_relative(solve_folder, file_path)
 
 	def contest_time_solve(self):
 		try:
-			submission_list = requests.get(
-				f"https://codeforces.com/api/user.status?"
-				f"handle={self.cf_handle}&from={1}&count={15}"
-			).json()
-			contest_list = requests.get(
-				"https://codeforces.com/api/contest.list?gym=false"
-			).json()
-
-			queue = load_queue()
-			file_name = os.path.basename(self.file_path)
-
-			for s in submission_list['result']:
-				contestId = f"{s['problem']['contestId']}"
-				problemId = f"{contestId}{s['problem']['index']}"
-				if problemId == self.prob_id and (s['verdict'] == 'OK' or s['verdict'] == 'PARTIAL') and s['author'][
-					'participantType'] == "CONTESTANT":
-					for c in contest_list['result']:
-						if f"{c['id']}" == contestId:
-							contest_end = c['startTimeSeconds'] + c['durationSeconds']
-							if file_name not in queue:
-								queue[file_name] = contest_end
-								save_queue(queue)
-							return True
-				else:
-					continue
-			return False
+			submission_index.sync(self.cf_handle)
+			contestId = submission_index.contest_solve(self.cf_handle, self.prob_id)
+			if contestId is None:
+				return False
+
+			contest_end = contest_cache.contest_end(contestId)
+			if contest_end is None:
+				return False
+
+			if contest_queue.enqueue(self.repo_file, contest_end):
+				contest_scheduler.add(contest_end)
+			return True
 		except Exception as e:
 			self.output_callback(f"Error checking contest time: {e}\n")
 			return False
@@ -201,87 +237,57 @@ class GitPushThread(threading.Thread):
 		try:
 			if self.contest_time_solve():
 				self.output_callback(
-					f"Added {os.path.basename(self.file_path)} to Contest Queue, due to it being a Contest Solution.\n"
-					f"Queued solutions will be auto pushed to Github on Restart after contest is finished."
+					f"Added {self.repo_file} to Contest Queue, due to it being a Contest Solution.\n"
+					f"Queued solutions will be auto pushed to Github as soon as the contest is finished."
 				)
 				self.finished_callback(close_tab=True)
 				return
 
-			os.chdir(self.solve_folder)
-
-			self.output_callback(f"Adding {os.path.basename(self.file_path)}...\n")
-			os.system(f"git add {os.path.basename(self.file_path)}")
-
-			self.output_callback(f"Committing solved {self.prob_id}...\n")
-			os.system(f'git commit -m "solved {self.prob_id}"')
-
-			self.output_callback("Pulling latest changes...\n")
-			os.system("git pull --rebase --autostash")
-
-			self.output_callback("Pushing to GitHub...\n")
-			os.system("git push origin main")
+			worker = get_git_worker(self.solve_folder)
+			job = worker.submit(
+				[self.repo_file], f"solved {self.prob_id}", self.output_callback
+			)
+			if worker.batch_window:
+				self.output_callback(f"Queued {self.repo_file} for the next batch push "
+									 f"(every {worker.batch_window}s and on quit).\n\n")
+				self.finished_callback(close_tab=True)
+				return
 
-			os.chdir("..")
-			self.output_callback("Completed.\n\n\n")
-			self.finished_callback(close_tab=True)
+			if job.wait():
+				self.output_callback("Completed.\n\n\n")
+			else:
+				self.output_callback("Push failed, the commit stays local until the next push.\n\n\n")
+			self.finished_callback(close_tab=job.success)
 		except Exception as e:
 			self.output_callback(f"Error: {str(e)}\n")
 			self.finished_callback(close_tab=False)
 
 
-class GitPushQueueThread(threading.Thread):
-	def __init__(self, solve_folder, output_callback):
-		super().__init__(daemon=True)
-		self.solve_folder = solve_folder
-		self.output_callback = output_callback
-
-	def run(self):
-		curr_time = int(time.time())
-		try:
-			queue = load_queue()
-			if not queue:
-				return
-
-			ready = []
-			pending = {}
-
-			for fname, contest_end in queue.items():
-				if curr_time >= contest_end:
-					ready.append(fname)
-				else:
-					pending[fname] = contest_end
-
-			if not ready:
-				return
-
-			self.output_callback(f"--- Pushing from Contest Queue ---\n")
-			os.chdir(self.solve_folder)
-
-			self.output_callback(f"Adding {', '.join(prob.split('.')[0] for prob in ready)} "
-								 f"from contest queue to Git\n")
-			os.system(f"git add {' '.join(ready)}")
-
-			self.output_callback(f"Committing 'solved contest problems "
-								 f"{', '.join(prob.split('.')[0] for prob in ready)}'\n")
-			os.system(f'git commit -m "solved contest problems '
-					  f'{", ".join(prob.split(".")[0] for prob in ready)}"')
-
-			self.output_callback("Pulling latest changes...\n")
-			os.system("git pull --rebase --autostash")
-
-			self.output_callback("Pushing to GitHub...\n")
-			os.system("git push origin main")
-
-			os.chdir("..")
-			self.output_callback(f"{', '.join(prob.split('.')[0] for prob in ready)} "
-								 f"pushed to Github\n")
-			save_queue(pending)
-			if pending:
-				self.output_callback(f"--- Contest Queue Updated ---\n\n")
-			else:
-				self.output_callback(f"--- Contest Queue Cleared ---\n\n")
-		except Exception as e:
-			self.output_callback(f"Failed to process queue. Error: {str(e)}\n\n")
+def push_contest_queue(solve_folder, output_callback):
+	"""Push every queued solve whose contest is over, runs on the contest scheduler's thread.
+	Raises when the push fails, so the scheduler tries again later."""
+	ready = contest_queue.ready()
+	if not ready:
+		return
+
+	output_callback(f"--- Pushing from Contest Queue ---\n")
+	worker = get_git_worker(solve_folder)
+	job = worker.submit(
+		ready,
+		f'solved contest problems {", ".join(problem_id(prob) for prob in ready)}',
+		output_callback
+	)
+	worker.flush()
+	if not job.wait():
+		raise RuntimeError("git push failed")
+
+	output_callback(f"{', '.join(problem_id(prob) for prob in ready)} "
+					f"pushed to Github\n")
+	contest_queue.dequeue(ready)
+	if contest_queue.pending_count():
+		output_callback(f"--- Contest Queue Updated ---\n\n")
+	else:
+		output_callback(f"--- Contest Queue Cleared ---\n\n")
 
 
 class FileTab:
@@ -292,26 +298,44 @@ class FileTab:
 		self.lang = lang
 		self.file_name = os.path.basename(file_path)
 		self.input_content = "Paste test input here BEFORE RUNNING THE CODE..."  # Store input for this tab
+		self.process = None  # Running solution, if any
+		self.stopped = False
+		self.time_limit = TIME_LIMIT
+		self.memory_limit_mb = MEMORY_LIMIT_MB
+		self.tests = []  # {"input": ..., "expected": ...}
+		self.generator = None  # Stress testing: generator taking a seed, and a brute force solution
+		self.brute = None
+		self.stress_stop = None  # threading.Event while a stress run is going
+		self.size_generator = None  # Complexity estimate: generator taking n, profiled up to max_n
+		self.max_n = MAX_N
 
 
 class CFMT_GUI:
-	def __init__(self, root, folder, cf_handle):
+	def __init__(self, root, folder, cf_handle, display_cap_kb=DISPLAY_CAP_KB, layout="flat"):
 		self.root = root
 		self.git_thread = None
 		self.solve_folder = folder
 		self.cf_handle = cf_handle
+		self.layout = layout
+		self.display_cap = display_cap_kb * 1024  # Run output shown in the log, the rest is spilled to a file
 
 		# Multi-file management
 		self.file_tabs = []
 		self.current_tab_index = None
 
+		# g++ does the work, so threads are enough to keep every core busy
+		self.build_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2)
+		self.run_pool = ThreadPoolExecutor(max_workers=8)
+
 		self.available_themes = [
 			'litera', 'flatly', 'minty', 'sandstone', 'morph',
 			'solar', 'superhero', 'darkly', 'cyborg', 'vapor'
 		]
 
 		self.init_ui()
-		self.root.after(500, self.start_processing_queue)
+		self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+		# Nothing touching the disk or the network runs before the window is painted
+		self.root.after(500, self.start_background_tasks)
 
 	def init_ui(self):
 		self.root.title("CFMT - Codeforces Management Tool")
@@ -350,7 +374,8 @@ class CFMT_GUI:
 			theme_menu.add_command(label=theme.capitalize(),
 								   command=lambda t=theme: self.change_theme(t))
 
-		self.tab_buttons = []
+		self.tab_widgets = {}  # FileTab -> (frame, tab button)
+		self.highlighted_tab = None
 
 		# Problem Input
 		prob_frame = ttk.Frame(main_frame)
@@ -379,27 +404,80 @@ class CFMT_GUI:
 		ttk.Radiobutton(lang_frame, text="C++",
 						variable=self.current_lang, value="cpp").grid(row=0, column=2, padx=5)
 
-		# Create file button
-		self.create_btn = ttk.Button(main_frame, text="Create Code File",
+		# Create file buttons
+		create_frame = ttk.Frame(main_frame)
+		create_frame.grid(row=4, column=0, sticky=(tk.W, tk.E))
+		create_frame.columnconfigure(0, weight=3)
+		create_frame.columnconfigure(1, weight=1)
+
+		self.create_btn = ttk.Button(create_frame, text="Create Code File",
 									 command=self.create_file, bootstyle="primary")
-		self.create_btn.grid(row=4, column=0, sticky=(tk.W, tk.E), padx=5, pady=5)
+		self.create_btn.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=5, pady=5)
+
+		self.contest_btn = ttk.Button(create_frame, text="Start Contest",
+									  command=self.start_contest, bootstyle="primary-outline")
+		self.contest_btn.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5, pady=5)
 
 		# Action buttons
 		actions_frame = ttk.Frame(main_frame)
 		actions_frame.grid(row=5, column=0, sticky=(tk.W, tk.E), pady=10)
-		actions_frame.columnconfigure([0, 1, 2], weight=1)
+		actions_frame.columnconfigure([0, 1, 2, 3, 4, 5], weight=1)
 
 		self.compile_btn = ttk.Button(actions_frame, text="Compile (C++)",
 									  command=self.compile_code, state="disabled")
 		self.compile_btn.grid(row=0, column=0, sticky=(tk.W, tk.E), padx=5)
 
+		self.compile_all_btn = ttk.Button(actions_frame, text="Compile All",
+										  command=self.compile_all)
+		self.compile_all_btn.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5)
+
 		self.run_btn = ttk.Button(actions_frame, text="Run Code",
 								  command=self.run_code, state="disabled")
-		self.run_btn.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5)
+		self.run_btn.grid(row=0, column=2, sticky=(tk.W, tk.E), padx=5)
+
+		self.stop_btn = ttk.Button(actions_frame, text="Stop",
+								   command=self.stop_run, bootstyle="danger-outline")
+		self.stop_btn.grid(row=0, column=3, sticky=(tk.W, tk.E), padx=5)
 
 		self.git_btn = ttk.Button(actions_frame, text="Git Push",
 								  command=self.git_push, state="disabled")
-		self.git_btn.grid(row=0, column=2, sticky=(tk.W, tk.E), padx=5)
+		self.git_btn.grid(row=0, column=4, sticky=(tk.W, tk.E), padx=5)
+
+		self.run_file_btn = ttk.Button(actions_frame, text="Run on File",
+									   command=self.run_file, bootstyle="secondary")
+		self.run_file_btn.grid(row=0, column=5, sticky=(tk.W, tk.E), padx=5)
+
+		self.add_test_btn = ttk.Button(actions_frame, text="Add Test",
+									   command=self.add_test, bootstyle="secondary")
+		self.add_test_btn.grid(row=1, column=0, sticky=(tk.W, tk.E), padx=5, pady=(10, 0))
+
+		self.run_tests_btn = ttk.Button(actions_frame, text="Run Tests",
+										command=self.run_tests, bootstyle="secondary")
+		self.run_tests_btn.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=5, pady=(10, 0))
+
+		self.clear_tests_btn = ttk.Button(actions_frame, text="Clear Tests",
+										  command=self.clear_tests, bootstyle="secondary")
+		self.clear_tests_btn.grid(row=1, column=2, sticky=(tk.W, tk.E), padx=5, pady=(10, 0))
+
+		self.float_check = tk.BooleanVar(value=False)
+		ttk.Checkbutton(actions_frame, text="Float answers (1e-6)",
+						variable=self.float_check).grid(row=1, column=3, padx=5, pady=(10, 0))
+
+		self.stress_btn = ttk.Button(actions_frame, text="Stress Test",
+									 command=self.stress_test, bootstyle="secondary")
+		self.stress_btn.grid(row=1, column=4, sticky=(tk.W, tk.E), padx=5, pady=(10, 0))
+
+		self.complexity_btn = ttk.Button(actions_frame, text="Complexity",
+										 command=self.estimate_complexity, bootstyle="secondary")
+		self.complexity_btn.grid(row=1, column=5, sticky=(tk.W, tk.E), padx=5, pady=(10, 0))
+
+		self.judged_run_btn = ttk.Button(actions_frame, text="Judged Run",
+										 command=self.judged_run, bootstyle="secondary")
+		self.judged_run_btn.grid(row=2, column=0, sticky=(tk.W, tk.E), padx=5, pady=(10, 0))
+
+		self.limits_btn = ttk.Button(actions_frame, text="Limits",
+									 command=self.set_limits, bootstyle="secondary")
+		self.limits_btn.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=5, pady=(10, 0))
 
 		# Bottom section with Logs and Inputs side by side
 		bottom_frame = ttk.Frame(main_frame)
@@ -420,6 +498,7 @@ class CFMT_GUI:
 									 font=("Consolas", 10), autohide=True)
 		self.log_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 		self.log_text.text.config(state="disabled")
+		self.log_sink = TkLogSink(self.root, self.log_text.text)
 
 		# Right: Inputs
 		right_frame = ttk.Frame(bottom_frame)
@@ -455,40 +534,48 @@ class CFMT_GUI:
 		self.tabs_container = ttk.Frame(tabs_border_frame)
 		self.tabs_container.pack(fill=tk.X)
 
-	def update_tab_display(self):
-		"""Refresh the tab buttons display as a horizontal bar"""
-
-		# Destroy all previous tab widgets
-		for widget in self.tabs_container.winfo_children():
-			widget.destroy()
-
-		self.tab_buttons.clear()
-
-		for idx, tab in enumerate(self.file_tabs):
-			is_active = (idx == self.current_tab_index)
-
-			tab_frame = ttk.Frame(self.tabs_container)
-			tab_frame.pack(side=tk.LEFT, padx=2)
+	def add_tab_widget(self, tab):
+		"""Create the button pair for a newly opened tab at the end of the bar"""
+		tab_frame = ttk.Frame(self.tabs_container)
+		tab_frame.pack(side=tk.LEFT, padx=2)
+
+		# Bound to the tab, not its index, so closing other tabs never stales the command
+		btn = ttk.Button(
+			tab_frame,
+			text=f"{tab.prob_id}.{tab.lang}",
+			command=lambda t=tab: self.switch_tab(self.file_tabs.index(t)),
+			bootstyle="secondary-outline",
+			width=10
+		)
+		btn.pack(side=tk.LEFT)
+
+		close_btn = ttk.Button(
+			tab_frame,
+			text=f"\u2715",
+			command=lambda t=tab: self.close_tab(self.file_tabs.index(t)),
+			bootstyle="danger-outline",
+			width=3
+		)
+		close_btn.pack(side=tk.LEFT, padx=(2, 0))
+
+		self.tab_widgets[tab] = (tab_frame, btn)
+
+	def remove_tab_widget(self, tab):
+		tab_frame, _ = self.tab_widgets.pop(tab)
+		tab_frame.destroy()
+		if self.highlighted_tab is tab:
+			self.highlighted_tab = None
 
-			btn = ttk.Button(
-				tab_frame,
-				text=f"{tab.prob_id}.{tab.lang}",
-				command=lambda i=idx: self.switch_tab(i),
-				bootstyle="primary" if is_active else "secondary-outline",
-				width=10
-			)
-			btn.pack(side=tk.LEFT)
-
-			close_btn = ttk.Button(
-				tab_frame,
-				text=f"\u2715",
-				command=lambda i=idx: self.close_tab(i),
-				bootstyle="danger-outline",
-				width=3
-			)
-			close_btn.pack(side=tk.LEFT, padx=(2, 0))
-
-			self.tab_buttons.append(btn)
+	def update_tab_display(self):
+		"""Restyle only the previously and newly active tab buttons"""
+		current = self.get_current_tab()
+		if current is self.highlighted_tab:
+			return
+		if self.highlighted_tab is not None:
+			self.tab_widgets[self.highlighted_tab][1].configure(bootstyle="secondary-outline")
+		if current is not None:
+			self.tab_widgets[current][1].configure(bootstyle="primary")
+		self.highlighted_tab = current
 
 	def switch_tab(self, index):
 		"""Switch to a different tab"""
@@ -521,9 +608,12 @@ class CFMT_GUI:
 		"""Close a specific tab"""
 		if 0 <= index < len(self.file_tabs):
 			tab = self.file_tabs[index]
+			if tab.process is not None:
+				kill_tree(tab.process)
 			self.append_log(f"--- Closed {tab.file_name} ---\n")
 
 			self.file_tabs.pop(index)
+			self.remove_tab_widget(tab)
 
 			if len(self.file_tabs) == 0:
 				self.current_tab_index = None
@@ -571,28 +661,27 @@ class CFMT_GUI:
 			return
 
 		ext = self.current_lang.get()
-		file_name = f"{prob_id}.{ext}"
-		file_path = os.path.join(self.solve_folder, file_name)
+		file_path = solution_path(self.solve_folder, prob_id, ext, self.layout)
+		create_from_template(file_path, ext)
+		if self.open_tab(file_path, prob_id, ext):
+			self.open_in_editor([file_path])
 
+	@staticmethod
+	def open_in_editor(paths):
+		cmd = "code " + " ".join(f'"{p}"' for p in paths)
+		if os.name == "nt":
+			subprocess.Popen(cmd, shell=True, creationflags=subprocess.CREATE_NO_WINDOW)
+		else:
+			subprocess.Popen(cmd, shell=True)
+
+	def open_tab(self, file_path, prob_id, ext):
+		"""Open a tab for an existing file, or switch to it. True if a new tab was opened"""
+		file_name = repo_relative(self.solve_folder, file_path)
 		for idx, tab in enumerate(self.file_tabs):
 			if tab.file_path == file_path:
 				self.switch_tab(idx)
 				self.append_log(f"--- {file_name} is already open ---\n")
-				return
-
-		if not os.path.exists(file_path):
-			template = f"{ext}_template.txt"
-			if os.path.exists(template):
-				with open(template, "r") as t, open(file_path, "w") as cf:
-					cf.write(t.read())
-			else:
-				open(file_path, "w").close()
-
-		if os.name == "nt":
-			subprocess.Popen(f'code "{file_path}"', shell=True,
-							 creationflags=subprocess.CREATE_NO_WINDOW)
-		else:
-			subprocess.Popen(f'code "{file_path}"', shell=True)
+				return False
 
 		# Save current tab's input before creating new tab
 		if self.current_tab_index is not None and 0 <= self.current_tab_index < len(self.file_tabs):
@@ -603,6 +692,7 @@ class CFMT_GUI:
 		self.file_tabs.append(new_tab)
 		self.current_tab_index = len(self.file_tabs) - 1
 
+		self.add_tab_widget(new_tab)
 		self.update_tab_display()
 
 		self.input_box.delete("1.0", tk.END)
@@ -621,6 +711,68 @@ class CFMT_GUI:
 			self.git_btn.config(state="disabled")
 		else:
 			self.git_btn.config(state="normal")
+		self.load_samples(new_tab)
+		return True
+
+	def load_samples(self, tab):
+		"""Fill the tab's tests with the problem's samples, from the cache or fetched on the run pool"""
+		def on_done(future):
+			try:
+				samples = future.result()
+			except Exception as e:
+				self.append_log(f"--- Couldn't get the samples of {tab.prob_id}: {e} ---\n")
+				return
+			if tab not in self.file_tabs or not samples:
+				return
+			if not tab.tests:
+				tab.tests = [dict(s) for s in samples]
+			placeholder = "Paste test input here BEFORE RUNNING THE CODE..."
+			if tab.input_content.strip() in ("", placeholder):
+				tab.input_content = samples[0]["input"]
+				if self.get_current_tab() is tab and self.input_box.get("1.0", tk.END).strip() in ("", placeholder):
+					self.input_box.delete("1.0", tk.END)
+					self.input_box.insert("1.0", tab.input_content)
+			self.append_log(f"--- {len(samples)} sample tests loaded for {tab.prob_id} ---\n")
+
+		self.run_in_background(self.run_pool, sample_fetcher.get, on_done, tab.prob_id)
+
+	def start_contest(self):
+		contest_id = simpledialog.askinteger("Start Contest", "Contest ID:", parent=self.root, minvalue=1)
+		if contest_id is None:
+			return
+		ext = self.current_lang.get()
+		self.contest_btn.config(state="disabled")
+		self.append_log(f"\n--- Preparing contest {contest_id} ---\n")
+
+		def on_done(future):
+			self.contest_btn.config(state="normal")
+			try:
+				problems = future.result()
+			except Exception as e:
+				self.append_log(f"Couldn't start contest {contest_id}: {e}\n")
+				return
+			opened = [path for prob_id, path in problems if self.open_tab(path, prob_id, ext)]
+			if opened:
+				self.open_in_editor(opened)
+			# Back to the first problem, the one to read first
+			for idx, tab in enumerate(self.file_tabs):
+				if problems and tab.file_path == problems[0][1]:
+					self.switch_tab(idx)
+					break
+			self.append_log(f"--- {len(problems)} problems of contest {contest_id} ready ---\n")
+			if ext == "cpp":
+				self.run_in_background(self.build_pool, warm_builds,
+									   lambda f: self.append_log(f"--- Contest builds warmed [{compile_cache.stats()}] ---\n"),
+									   [path for _, path in problems])
+
+		self.run_in_background(self.run_pool, prepare_contest, on_done,
+							   contest_id, self.solve_folder, ext, self.layout)
+
+	def run_in_background(self, pool, fn, on_done, *args):
+		"""Run fn on pool and hand its future to on_done on the Tk thread"""
+		future = pool.submit(fn, *args)
+		future.add_done_callback(lambda f: self.root.after(0, on_done, f))
+		return future
 
 	def compile_code(self):
 		tab = self.get_current_tab()
@@ -632,47 +784,281 @@ class CFMT_GUI:
 			self.append_log("Python does not need compilation.\n")
 			return
 
-		cmd = f'g++ -std=c++14 "{tab.file_path}" -o a.exe'
 		self.append_log(f"\nCompiling {tab.file_name}...\n")
-		result = os.system(cmd)
-		if result == 0:
-			self.append_log("\nCompiled successfully!\n")
-		else:
-			self.append_log("\nCompilation failed!\n")
 
-	def run_code(self):
+		def on_done(future):
+			try:
+				result, output, hit = future.result()
+			except Exception as e:
+				result, output, hit = 1, f"{e}\n", False
+			if output:
+				self.append_log(output)
+			if result == 0:
+				self.append_log(f"\n{tab.file_name} compiled successfully{' (cached)' if hit else ''}! "
+								f"[{compile_cache.stats()}]\n")
+			else:
+				self.append_log(f"\n{tab.file_name} compilation failed!\n")
+
+		self.run_in_background(self.build_pool, compile_cache.compile, on_done, tab.file_path)
+
+	def compile_all(self):
+		"""Build every open C++ tab in parallel, reporting each one as it finishes"""
+		tabs = [tab for tab in self.file_tabs if tab.lang == "cpp"]
+		if not tabs:
+			self.append_log("No C++ files open.\n")
+			return
+
+		self.append_log(f"\n--- Compiling {len(tabs)} files ---\n")
+		remaining = [len(tabs)]
+
+		def on_done(tab, future):
+			try:
+				result, output, hit = future.result()
+			except Exception as e:
+				result, output, hit = 1, f"{e}\n", False
+			if output:
+				self.append_log(output)
+			if result == 0:
+				self.append_log(f"{tab.file_name}: compiled{' (cached)' if hit else ''}\n")
+			else:
+				self.append_log(f"{tab.file_name}: compilation failed!\n")
+			remaining[0] -= 1
+			if not remaining[0]:
+				self.append_log(f"--- Compile All finished [{compile_cache.stats()}] ---\n")
+
+		for tab in tabs:
+			self.run_in_background(self.build_pool, compile_cache.compile,
+								   lambda f, t=tab: on_done(t, f), tab.file_path)
+
+	def execute(self, tab, user_input, out_path, stdin_file=None, judged=False):
+		"""Runs on the run pool, tab.process is what the Stop button kills.
+		stdout is streamed into the log sink as it arrives. Only judged runs get the
+		tab's limits, a plain run goes on until it exits or is stopped."""
+		def on_start(process):
+			tab.process = process
+
+		time_limit, memory_limit_mb = (tab.time_limit, tab.memory_limit_mb) if judged else (None, None)
+		try:
+			return run_solution(solution_command(tab.lang, tab.file_path), user_input,
+								time_limit, memory_limit_mb, on_start=on_start,
+								on_output=self.append_log, spill_to=out_path, display_cap=self.display_cap,
+								stdin_file=stdin_file)
+		finally:
+			tab.process = None
+
+	def run_file(self):
+		"""Run on a big input file, e.g. from maxtests.py, fed to stdin without loading it"""
+		if not self.get_current_tab():
+			messagebox.showwarning("No File Selected", "Please create or select a file first.")
+			return
+		path = filedialog.askopenfilename(parent=self.root, title="Input file")
+		if path:
+			# Big files are for checking the limits, so these runs are judged
+			self.run_code(stdin_file=path, judged=True)
+
+	def judged_run(self):
+		self.run_code(judged=True)
+
+	def set_limits(self):
+		"""Time and memory limits of the current tab, used by judged runs, tests, stress and complexity"""
+		tab = self.get_current_tab()
+		if not tab:
+			messagebox.showwarning("No File Selected", "Please create or select a file first.")
+			return
+		time_limit = simpledialog.askfloat("Limits", f"Time limit of {tab.prob_id} in seconds:", parent=self.root,
+										   initialvalue=tab.time_limit, minvalue=0.1)
+		if time_limit is None:
+			return
+		memory_limit_mb = simpledialog.askinteger("Limits", f"Memory limit of {tab.prob_id} in MB:", parent=self.root,
+												  initialvalue=tab.memory_limit_mb, minvalue=1)
+		if memory_limit_mb is None:
+			return
+		tab.time_limit, tab.memory_limit_mb = time_limit, memory_limit_mb
+		self.append_log(f"\n{tab.prob_id} limits: {time_limit:g}s, {memory_limit_mb} MB\n")
+
+	def run_code(self, stdin_file=None, judged=False):
 		tab = self.get_current_tab()
 		if not tab:
 			messagebox.showwarning("No File Selected", "Please create or select a file first.")
 			return
 
-		self.append_log(f"\n--- Running {tab.prob_id} ---\n")
-		user_input = self.input_box.get("1.0", tk.END)
+		if tab.process is not None:
+			self.append_log(f"\n{tab.prob_id} is still running, stop it first.\n")
+			return
+
+		limits = f" ({tab.time_limit:g}s, {tab.memory_limit_mb} MB)" if judged else ""
+		self.append_log(f"\n--- Running {tab.prob_id}{f' on {os.path.basename(stdin_file)}' if stdin_file else ''}{limits} ---\n")
+		user_input = "" if stdin_file else self.input_box.get("1.0", tk.END)
 
 		if user_input.strip() == "Paste test input here BEFORE RUNNING THE CODE...":
 			user_input = ""
 
-		try:
-			if tab.lang == "cpp":
-				cmd = ["a.exe"]
-			elif tab.lang == "py":
-				cmd = ["python", tab.file_path]
+		out_path = spill_path(self.solve_folder, tab.prob_id)
+		self.append_log(f"-- Output ({tab.prob_id}):\n")
 
-			process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
-									   stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-									   text=True)
+		def on_done(future):
+			try:
+				result = future.result()
+			except Exception as e:
+				self.append_log(f"\nRuntime Error: {str(e)}\n")
+				return
 
-			stdout, stderr = process.communicate(user_input)
+			self.append_log("\n")
+			if result.stdout_bytes > self.display_cap:
+				self.append_log(f"[output truncated at {self.display_cap // 1024} KB of "
+								f"{result.stdout_bytes // 1024} KB, full output in {out_path}]\n")
 
-			if stdout.strip():
-				self.append_log("-- Output:\n")
-				self.append_log(stdout + "\n")
+			if result.stderr.strip():
+				self.append_log("\n[Error]\n" + result.stderr + "\n")
 
-			if stderr.strip():
-				self.append_log("\n[Error]\n" + stderr + "\n")
+			if tab.stopped:
+				tab.stopped = False
+				self.append_log(f"--- {tab.prob_id} stopped ---\n")
+			else:
+				self.append_log(f"-- {result.summary()}\n")
 
-		except Exception as e:
-			self.append_log(f"\nRuntime Error: {str(e)}\n")
+		tab.stopped = False
+		self.run_in_background(self.run_pool, self.execute, on_done, tab, user_input, out_path, stdin_file, judged)
+
+	def add_test(self):
+		tab = self.get_current_tab()
+		if not tab:
+			messagebox.showwarning("No File Selected", "Please create or select a file first.")
+			return
+
+		test_input = self.input_box.get("1.0", tk.END)
+		if test_input.strip() == "Paste test input here BEFORE RUNNING THE CODE...":
+			test_input = ""
+
+		dialog = TestCaseDialog(self.root, test_input)
+		self.root.wait_window(dialog)
+		if dialog.test:
+			tab.tests.append(dialog.test)
+			self.append_log(f"--- Test {len(tab.tests)} added to {tab.prob_id} ---\n")
+
+	def clear_tests(self):
+		tab = self.get_current_tab()
+		if tab:
+			tab.tests.clear()
+			self.append_log(f"--- Tests of {tab.prob_id} cleared ---\n")
+
+	def run_tests(self):
+		tab = self.get_current_tab()
+		if not tab:
+			messagebox.showwarning("No File Selected", "Please create or select a file first.")
+			return
+		if not tab.tests:
+			self.append_log(f"\n{tab.prob_id} has no tests, add some with 'Add Test'.\n")
+			return
+
+		self.append_log(f"\n--- Running {len(tab.tests)} tests on {tab.prob_id} ---\n")
+		eps = 1e-6 if self.float_check.get() else None
+
+		def on_done(future):
+			try:
+				self.append_log(results_table(future.result()))
+			except Exception as e:
+				self.append_log(f"\nFailed to run tests: {str(e)}\n")
+
+		self.run_in_background(self.run_pool, run_tests, on_done,
+							   solution_command(tab.lang, tab.file_path), list(tab.tests),
+							   tab.time_limit, tab.memory_limit_mb, eps)
+
+	def stress_test(self):
+		tab = self.get_current_tab()
+		if not tab:
+			messagebox.showwarning("No File Selected", "Please create or select a file first.")
+			return
+		if tab.stress_stop is not None:
+			self.append_log(f"\nA stress test of {tab.prob_id} is already running, stop it first.\n")
+			return
+		filetypes = [("Solutions", "*.cpp *.py")]
+		if not tab.generator:
+			tab.generator = filedialog.askopenfilename(parent=self.root, initialdir=self.solve_folder, filetypes=filetypes,
+													   title="Generator (prints a random test for the seed in argv[1])")
+		if tab.generator and not tab.brute:
+			tab.brute = filedialog.askopenfilename(parent=self.root, initialdir=self.solve_folder, filetypes=filetypes,
+												   title="Brute force solution")
+		if not tab.generator or not tab.brute:
+			tab.generator = tab.brute = None
+			return
+
+		tab.stress_stop = threading.Event()
+		eps = 1e-6 if self.float_check.get() else None
+		self.append_log(f"\n--- Stress testing {tab.prob_id} against {os.path.basename(tab.brute)}, "
+						f"up to {STRESS_CASES} cases ---\n")
+
+		def job():
+			gen_cmd, brute_cmd, sol_cmd = (build_command(p) for p in (tab.generator, tab.brute, tab.file_path))
+			return stress(gen_cmd, brute_cmd, sol_cmd, STRESS_CASES, tab.time_limit, tab.memory_limit_mb, eps,
+						  on_progress=lambda n, rate: self.append_log(f"[stress {tab.prob_id}] {n} cases, {rate:.1f} cases/s\n"),
+						  stop=tab.stress_stop)
+
+		def on_done(future):
+			stopped = tab.stress_stop.is_set()
+			tab.stress_stop = None
+			try:
+				cases, failure = future.result()
+			except Exception as e:
+				self.append_log(f"\nStress test failed: {str(e)}\n")
+				return
+			if failure is None:
+				self.append_log(f"--- {cases} cases passed{' (stopped)' if stopped else ''} ---\n")
+			elif "error" in failure:
+				self.append_log(f"--- Stress test aborted on seed {failure['seed']}: {failure['error']} ---\n")
+			else:
+				tab.tests.append({"input": failure["input"], "expected": failure["expected"]})
+				self.append_log(f"--- Mismatch after {cases} cases (seed {failure['seed']}): {failure['summary']} ---\n"
+								f"-- Input:\n{failure['input'][:2000]}\n"
+								f"--- Saved as test {len(tab.tests)} of {tab.prob_id} ---\n")
+
+		self.run_in_background(self.run_pool, job, on_done)
+
+	def estimate_complexity(self):
+		tab = self.get_current_tab()
+		if not tab:
+			messagebox.showwarning("No File Selected", "Please create or select a file first.")
+			return
+		if not tab.size_generator:
+			tab.size_generator = filedialog.askopenfilename(parent=self.root, initialdir=self.solve_folder,
+															filetypes=[("Solutions", "*.cpp *.py")],
+															title="Generator (prints a test of size n, n in argv[1])")
+			if not tab.size_generator:
+				tab.size_generator = None
+				return
+		max_n = simpledialog.askinteger("Complexity", "Maximum n from the constraints:", parent=self.root,
+										initialvalue=tab.max_n, minvalue=1)
+		if max_n is None:
+			return
+		tab.max_n = max_n
+		self.complexity_btn.config(state="disabled")
+		self.append_log(f"\n--- Profiling {tab.prob_id} up to n = {max_n} ---\n")
+
+		def job():
+			gen_cmd, sol_cmd = build_command(tab.size_generator), build_command(tab.file_path)
+			return profile(gen_cmd, sol_cmd, max_n, tab.time_limit, tab.memory_limit_mb,
+						   on_point=lambda n, seconds, kb, verdict: self.append_log(f"[{tab.prob_id}] n = {n}: {seconds:.3f}s {verdict}\n"))
+
+		def on_done(future):
+			self.complexity_btn.config(state="normal")
+			try:
+				self.append_log(future.result().report())
+			except Exception as e:
+				self.append_log(f"\nProfiling failed: {str(e)}\n")
+
+		self.run_in_background(self.run_pool, job, on_done)
+
+	def stop_run(self):
+		tab = self.get_current_tab()
+		if tab and tab.stress_stop is not None:
+			tab.stress_stop.set()
+			self.append_log(f"\n--- Stopping the stress test of {tab.prob_id} ---\n")
+			return
+		if not tab or tab.process is None:
+			self.append_log("\nNothing is running in this tab.\n")
+			return
+		tab.stopped = True
+		kill_tree(tab.process)
 
 	def git_push(self):
 		tab = self.get_current_tab()
@@ -692,12 +1078,9 @@ class CFMT_GUI:
 
 			self.root.after(0, update_ui)
 
-		def on_output(text):
-			self.root.after(0, lambda: self.append_log(text))
-
 		self.git_thread = GitPushThread(tab.file_path, tab.prob_id,
 										self.solve_folder, self.cf_handle,
-										on_output, on_finished)
+										self.append_log, on_finished)
 		self.git_thread.start()
 
 	def change_theme(self, theme_name):
@@ -716,10 +1099,8 @@ class CFMT_GUI:
 			self.input_box.delete("1.0", tk.END)
 
 	def append_log(self, text):
-		self.log_text.text.config(state="normal")
-		self.log_text.text.insert(tk.END, text)
-		self.log_text.text.see(tk.END)
-		self.log_text.text.config(state="disabled")
+		"""Safe from any thread, the sink writes to the widget in batches"""
+		self.log_sink.write(text)
 
 	@staticmethod
 	def validate_problem_id(prob_id):
@@ -731,16 +1112,56 @@ class CFMT_GUI:
 
 	@staticmethod
 	def is_git_logged_in():
-		name = subprocess.getoutput("git config --global user.name").strip()
-		email = subprocess.getoutput("git config --global user.email").strip()
-		return bool(name) and bool(email)
+		return git_env.is_logged_in()
+
+	def report_git_env(self, env):
+		if env.version is None:
+			self.append_log("--- git was not found, pushing is unavailable ---\n")
+		elif env.remote_reachable is False:
+			self.append_log("--- Could not reach the repository's remote, pushes will fail until it is reachable ---\n")
+
+	def on_close(self):
+		"""Push batched solves before quitting, without blocking the Tk thread the
+		worker's log callbacks are marshalled onto"""
+		for tab in self.file_tabs:
+			if tab.stress_stop is not None:
+				tab.stress_stop.set()
+			if tab.process is not None:
+				kill_tree(tab.process)
+		# Queued work would otherwise keep the process alive after the window is gone
+		for pool in (self.run_pool, self.build_pool):
+			pool.shutdown(wait=False, cancel_futures=True)
+		shutdown_test_pool()
+
+		self.append_log("\n--- Pushing batched solutions before quitting ---\n")
+		flushed = []
+		flusher = threading.Thread(target=lambda: flushed.append(flush_git_workers(QUIT_PUSH_TIMEOUT)),
+								   daemon=True)
+		flusher.start()
+
+		def wait_for_flush():
+			if flusher.is_alive():
+				self.root.after(100, wait_for_flush)
+			elif flushed and flushed[0]:
+				self.root.destroy()
+			else:
+				# A hung push must not keep the window open forever
+				self.append_log(f"Push still running after {QUIT_PUSH_TIMEOUT}s, quitting anyway. "
+								f"Unpushed solves stay committed locally and go out with the next push.\n")
+				self.root.after(1500, self.root.destroy)
+
+		wait_for_flush()
 
-	def start_processing_queue(self):
-		def on_output(text):
-			self.root.after(0, lambda: self.append_log(text))
+	def start_background_tasks(self):
+		self.start_contest_scheduler()
+		threading.Thread(target=compile_cache.warm, args=("cpp_template.txt",), daemon=True).start()
+		git_env.start(self.solve_folder, self.report_git_env)
 
-		queue_thread = GitPushQueueThread(self.solve_folder, on_output)
-		queue_thread.start()
+	def start_contest_scheduler(self):
+		# append_log is thread-safe, the push runs right on the scheduler's thread
+		contest_scheduler.start(contest_queue.contest_ends(),
+								lambda: push_contest_queue(self.solve_folder, self.append_log),
+								self.append_log)
 
 
 def main():
@@ -779,11 +1200,18 @@ def main():
 
 	git_repo_name = user_config["git_repo_name"]
 	cf_handle = user_config["cf_username"]
+	get_git_worker(git_repo_name, user_config.get("batch_push_seconds", 0))
 
 	root.deiconify()
-	app = CFMT_GUI(root, git_repo_name, cf_handle)
+	app = CFMT_GUI(root, git_repo_name, cf_handle,
+				   user_config.get("output_display_kb", DISPLAY_CAP_KB), user_config.get("layout", "flat"))
 	root.mainloop()
 
 
 if __name__ == "__main__":
+	# A frozen executable re-runs itself for every spawned test worker, this hands those over to
+	# multiprocessing. Imported only here so the normal start-up doesn't pay for it
+	if getattr(sys, "frozen", False):
+		import multiprocessing
+		multiprocessing.freeze_support()
 	main()
\ No newline at end of file
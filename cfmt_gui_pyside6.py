@@ -1,12 +1,40 @@
 import sys
 import os
-import subprocess
+from git_worker import get_git_worker
+from compile_cache import compile_cache
+from harness import run_solution, solution_command, spill_path, DISPLAY_CAP_KB, TIME_LIMIT, MEMORY_LIMIT_MB
+from process_tree import kill_tree
 from PySide6.QtWidgets import (
 	QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 	QLineEdit, QPushButton, QTextEdit, QRadioButton, QButtonGroup, QMessageBox, QInputDialog
 )
-from PySide6.QtCore import Qt, QThread, Signal, QPropertyAnimation, QEasingCurve
-from PySide6.QtGui import QFont, QIcon
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QPropertyAnimation, QEasingCurve
+from PySide6.QtGui import QFont, QIcon, QTextCursor
+from log_sink import LogSink, MAX_LOG_LINES, FLUSH_INTERVAL_MS
+from git_env import git_env
+from repo_clone import clone_repo, CLONE_MODES
+from solution_layout import configured_layout, solution_path, repo_relative
+
+
+class QtLogSink(LogSink):
+	"""Drains into a QTextEdit every interval_ms with one insert, Qt itself drops
+	the oldest blocks past max_lines"""
+	def __init__(self, text_edit, max_lines=MAX_LOG_LINES, interval_ms=FLUSH_INTERVAL_MS):
+		super().__init__()
+		self.text_edit = text_edit
+		self.text_edit.document().setMaximumBlockCount(max_lines)
+		self.timer = QTimer()
+		self.timer.timeout.connect(self.flush)
+		self.timer.start(interval_ms)
+
+	def flush(self):
+		text = self.take()
+		if text:
+			cursor = self.text_edit.textCursor()
+			cursor.movePosition(QTextCursor.End)
+			cursor.insertText(text)
+			self.text_edit.moveCursor(QTextCursor.End)
+			self.text_edit.ensureCursorVisible()
 
 
 class GitPushThread(QThread):
@@ -21,24 +49,79 @@ class GitPushThread(QThread):
 
 	def run(self):
 		try:
-			os.chdir(self.solve_folder)
+			job = get_git_worker(self.solve_folder).submit(
+				[repo_relative(self.solve_folder, self.file_path)], f"solved {self.prob_id}",
+				lambda text: self.output_signal.emit(text.rstrip("\n"))
+			)
+			if job.wait():
+				self.output_signal.emit("Completed.")
+			else:
+				self.output_signal.emit("Push failed, the commit stays local until the next push.")
+		except Exception as e:
+			self.output_signal.emit(f"Error: {str(e)}")
+		finally:
+			self.finished_signal.emit()
+
 
-			self.output_signal.emit(f"Adding {os.path.basename(self.file_path)}...")
-			os.system(f"git add {os.path.basename(self.file_path)}")
+class RunThread(QThread):
+	"""run_solution off the Qt thread, stdout goes to on_output as it arrives.
+	Limits of None leave the run unlimited, stop() ends it either way."""
+	output_signal = Signal(str)
+	finished_signal = Signal()
 
-			self.output_signal.emit(f"Committing solved {self.prob_id}...")
-			os.system(f'git commit -m "solved {self.prob_id}"')
+	def __init__(self, cmd, user_input, out_path, on_output, time_limit=None, memory_limit_mb=None):
+		super().__init__()
+		self.cmd = cmd
+		self.user_input = user_input
+		self.out_path = out_path
+		self.on_output = on_output
+		self.time_limit = time_limit
+		self.memory_limit_mb = memory_limit_mb
+		self.process = None
 
-			self.output_signal.emit("Pulling latest changes...")
-			os.system("git pull --rebase --autostash")
+	def on_start(self, process):
+		self.process = process
 
-			self.output_signal.emit("Pushing to GitHub...")
-			os.system("git push origin main")
+	def stop(self):
+		if self.process is not None:
+			kill_tree(self.process)
 
-			os.chdir("..")
-			self.output_signal.emit("Completed.")
+	def run(self):
+		try:
+			result = run_solution(self.cmd, self.user_input, self.time_limit, self.memory_limit_mb,
+								  on_start=self.on_start, on_output=self.on_output,
+								  spill_to=self.out_path, display_cap=DISPLAY_CAP_KB * 1024)
+			if result.stderr.strip():
+				self.output_signal.emit("\n[Error]\n" + result.stderr)
+			if result.stdout_bytes > DISPLAY_CAP_KB * 1024:
+				self.output_signal.emit(f"[output truncated at {DISPLAY_CAP_KB} KB, full output in {self.out_path}]")
+			self.output_signal.emit(f"\n-- {result.summary()}")
 		except Exception as e:
-			self.output_signal.emit(f"Error: {str(e)}")
+			self.output_signal.emit(f"\nRuntime Error: {str(e)}")
+		finally:
+			self.finished_signal.emit()
+
+
+class CompileThread(QThread):
+	"""compile_cache.compile off the Qt thread, a cold compile takes over a second"""
+	output_signal = Signal(str)
+	finished_signal = Signal()
+
+	def __init__(self, file_path):
+		super().__init__()
+		self.file_path = file_path
+
+	def run(self):
+		try:
+			result, output, hit = compile_cache.compile(self.file_path)
+			if output:
+				self.output_signal.emit(output)
+			if result == 0:
+				self.output_signal.emit(f"\nCompiled successfully{' (cached)' if hit else ''}! [{compile_cache.stats()}]\n")
+			else:
+				self.output_signal.emit("\nCompilation failed!\n")
+		except Exception as e:
+			self.output_signal.emit(f"\nCompilation Error: {str(e)}\n")
 		finally:
 			self.finished_signal.emit()
 
@@ -54,6 +137,7 @@ class CFMT_GUI(QMainWindow):
 		self.init_user_info()
 
 		self.init_ui()
+		git_env.start(self.solve_folder)
 
 	def init_user_info(self):
 		if not os.path.exists("user_info.txt"):
@@ -66,18 +150,21 @@ class CFMT_GUI(QMainWindow):
 		if not os.path.exists(self.solve_folder):
 			QMessageBox.information(self, "Cloning Repo",
 									f"Cloning repository: {self.solve_folder}")
-			os.system(f"git clone https://github.com/{self.github_username}/{self.solve_folder}.git")
+			clone_repo(self.github_username, self.solve_folder)
 
 	def setup_user_info(self):
 		github_username = self.popup_input("GitHub username:")
 		git_repo_name = self.popup_input("Your CF Repository name:")
 
+		clone_mode, ok = QInputDialog.getItem(self, "Setup Required", "Clone mode (partial/shallow for large repositories):",
+											  CLONE_MODES, 0, False)
+
 		self.github_username = github_username
 
 		with open("user_info.txt", "w") as f:
 			f.write(git_repo_name)
 
-		os.system(f"git clone https://github.com/{github_username}/{git_repo_name}.git")
+		clone_repo(github_username, git_repo_name, clone_mode if ok else "full")
 
 	def popup_input(self, message):
 		text, ok = QInputDialog.getText(self, "Setup Required", message)
@@ -207,11 +294,19 @@ class CFMT_GUI(QMainWindow):
 		self.run_btn.clicked.connect(self.run_code)
 		self.run_btn.setEnabled(False)
 
+		self.judged_run_btn = QPushButton("Judged Run")
+		self.judged_run_btn.clicked.connect(self.judged_run)
+		self.judged_run_btn.setEnabled(False)
+
+		self.stop_btn = QPushButton("Stop")
+		self.stop_btn.clicked.connect(self.stop_run)
+		self.stop_btn.setEnabled(False)
+
 		self.git_btn = QPushButton("Git Push")
 		self.git_btn.clicked.connect(self.git_push)
 		self.git_btn.setEnabled(False)
 
-		for btn in [self.compile_btn, self.run_btn, self.git_btn]:
+		for btn in [self.compile_btn, self.run_btn, self.judged_run_btn, self.stop_btn, self.git_btn]:
 			btn.setMinimumHeight(40)
 			btn.setFont(QFont("Segoe UI", 9))
 			btn.setStyleSheet("""
@@ -238,6 +333,8 @@ class CFMT_GUI(QMainWindow):
 
 		actions.addWidget(self.compile_btn)
 		actions.addWidget(self.run_btn)
+		actions.addWidget(self.judged_run_btn)
+		actions.addWidget(self.stop_btn)
 		actions.addWidget(self.git_btn)
 		layout.addLayout(actions)
 
@@ -251,6 +348,7 @@ class CFMT_GUI(QMainWindow):
 
 		self.log_text = QTextEdit()
 		self.log_text.setReadOnly(True)
+		self.log_sink = QtLogSink(self.log_text)
 
 		# Right: Inputs
 		right_box_layout = QVBoxLayout()
@@ -283,6 +381,9 @@ class CFMT_GUI(QMainWindow):
 
 		layout.addLayout(bottom_layout)
 
+	def log(self, text):
+		self.log_sink.write(text + "\n")
+
 	def set_language(self, lang):
 		self.current_lang = lang
 
@@ -293,8 +394,8 @@ class CFMT_GUI(QMainWindow):
 			return
 
 		ext = "py" if self.current_lang == "py" else "cpp"
-		file_name = f"{prob_id}.{ext}"
-		file_path = os.path.join(self.solve_folder, file_name)
+		file_path = solution_path(self.solve_folder, prob_id, ext, configured_layout())
+		file_name = repo_relative(self.solve_folder, file_path)
 
 		# From template
 		if not os.path.exists(file_path):
@@ -310,12 +411,13 @@ class CFMT_GUI(QMainWindow):
 
 		self.input_box.clear()
 		self.input_box.setPlaceholderText("Paste test input here BEFORE RUNNING THE CODE...")
-		self.log_text.append(f"--- {file_name} created ---\n")
+		self.log(f"--- {file_name} created ---\n")
 		self.compile_btn.setEnabled(True)
 		self.run_btn.setEnabled(True)
+		self.judged_run_btn.setEnabled(True)
 		self.git_btn.setEnabled(True)
 		if not self.is_git_logged_in():
-			self.log_text.append(f"--- To access Git push operation: \n"
+			self.log(f"--- To access Git push operation: \n"
 									f"--- Download and Log into Github Desktop app from: "
 									f"'https://desktop.github.com/download/'\n"
 									f"--- Otherwise, your solutions will be stored in {self.solve_folder}, "
@@ -324,71 +426,67 @@ class CFMT_GUI(QMainWindow):
 
 	def compile_code(self):
 		if self.current_lang == "py":
-			self.log_text.append("Python does not need compilation.\n")
+			self.log("Python does not need compilation.\n")
 			return
 
-		cmd = f'g++ -std=c++14 "{self.current_file_path}" -o a.exe'
-		self.log_text.append(f"\nCompiling...\n")
-		result = os.system(cmd)
-		if result == 0:
-			self.log_text.append("\nCompiled successfully!\n")
-		else:
-			self.log_text.append("\nCompilation failed!\n")
+		self.compile_btn.setEnabled(False)
+		self.log(f"\nCompiling...\n")
 
-	def run_code(self):
+		self.compile_thread = CompileThread(self.current_file_path)
+		self.compile_thread.output_signal.connect(self.log)
+		self.compile_thread.finished_signal.connect(lambda: self.compile_btn.setEnabled(True))
+		self.compile_thread.start()
+
+	def run_code(self, judged=False):
+		"""Plain runs have no limits, Stop ends them; judged runs get Codeforces' default limits"""
 		prob_id = self.prob_input.text().strip()
 		if not prob_id:
 			QMessageBox.warning(self, "\nError", "Enter a Problem ID first!")
 			return
-		self.log_text.append(f"--- Running {prob_id} ---\n")
-		user_input = self.input_box.toPlainText()
-
-		try:
-			if self.current_lang == "cpp":
-				cmd = ["a.exe"]
-
-			elif self.current_lang == "py":
-				cmd = ["python", self.current_file_path]
-
-			# Proper way to run code with stdin/stdout pipes
-			process = subprocess.Popen(
-				cmd,
-				stdin=subprocess.PIPE,
-				stdout=subprocess.PIPE,
-				stderr=subprocess.PIPE,
-				text=True
-			)
-
-			stdout, stderr = process.communicate(user_input)
+		self.set_running(True)
+		limits = f" ({TIME_LIMIT:g}s, {MEMORY_LIMIT_MB} MB)" if judged else ""
+		self.log(f"--- Running {prob_id}{limits} ---\n")
+		self.log("-- Output:\n")
+
+		self.run_thread = RunThread(
+			solution_command(self.current_lang, self.current_file_path),
+			self.input_box.toPlainText(),
+			spill_path(self.solve_folder, prob_id),
+			self.log_sink.write,
+			TIME_LIMIT if judged else None,
+			MEMORY_LIMIT_MB if judged else None
+		)
+		self.run_thread.output_signal.connect(self.log)
+		self.run_thread.finished_signal.connect(lambda: self.set_running(False))
+		self.run_thread.start()
 
-			# Display program output
-			if stdout.strip():
-				self.log_text.append("-- Output:\n")
-				self.log_text.append(stdout)
+	def judged_run(self):
+		self.run_code(judged=True)
 
-			if stderr.strip():
-				self.log_text.append("\n[Error]\n" + stderr)
+	def stop_run(self):
+		self.run_thread.stop()
+		self.log(f"--- {self.prob_input.text().strip()} stopped ---")
 
-		except Exception as e:
-			self.log_text.append(f"\nRuntime Error: {str(e)}")
+	def set_running(self, running):
+		self.run_btn.setEnabled(not running)
+		self.judged_run_btn.setEnabled(not running)
+		self.stop_btn.setEnabled(running)
 
 	def is_git_logged_in(self):
-		name = subprocess.getoutput("git config --global user.name").strip()
-		email = subprocess.getoutput("git config --global user.email").strip()
-		return bool(name) and bool(email)
+		return git_env.is_logged_in()
 
 	def git_push(self):
 		prob_id = self.prob_input.text().strip()
 
 		self.git_btn.setEnabled(False)
-		self.log_text.append("\n--- Git Push Started ---\n")
+		self.log("\n--- Git Push Started ---\n")
 
 		self.git_thread = GitPushThread(
 			self.current_file_path,
 			prob_id,
 			self.solve_folder
 		)
-		self.git_thread.output_signal.connect(self.log_text.append)
+		self.git_thread.output_signal.connect(self.log)
 		self.git_thread.finished_signal.connect(lambda: self.git_btn.setEnabled(True))
 		self.git_thread.start()
 
@@ -0,0 +1,40 @@
+import re
+from itertools import zip_longest
+
+TOKEN_RE = re.compile(r"\S+")
+
+
+def tokens(text):
+	"""Yields (line number, token) lazily, so a mismatch early on stops the scan there"""
+	line_no = 1
+	pos = 0
+	for m in TOKEN_RE.finditer(text):
+		line_no += text.count("\n", pos, m.start())
+		pos = m.start()
+		yield line_no, m.group()
+
+
+def tokens_equal(expected, actual, eps):
+	if expected == actual:
+		return True
+	if eps is None:
+		return False
+	try:
+		e, a = float(expected), float(actual)
+	except ValueError:
+		return False
+	# Codeforces style: absolute or relative error within eps
+	return abs(e - a) <= eps * max(1.0, abs(e))
+
+
+def compare_output(expected, actual, eps=None):
+	"""Token-by-token comparison ignoring whitespace layout.
+	Returns (True, "") or (False, description of the first mismatch)."""
+	for idx, (exp, act) in enumerate(zip_longest(tokens(expected), tokens(actual)), 1):
+		if exp is None:
+			return False, f"line {act[0]}, token {idx}: extra output '{act[1][:30]}'"
+		if act is None:
+			return False, f"line {exp[0]}, token {idx}: output ended, expected '{exp[1][:30]}'"
+		if not tokens_equal(exp[1], act[1], eps):
+			return False, f"line {act[0]}, token {idx}: expected '{exp[1][:30]}', got '{act[1][:30]}'"
+	return True, ""
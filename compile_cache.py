@@ -0,0 +1,132 @@
+import os, shutil, hashlib, subprocess, threading
+from pch import precompiled_headers, first_heavy_include
+
+CACHE_DIR = os.path.join(".cfmt_cache", "bin")
+BUILD_DIR = "build"
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+COMPILER = "g++"
+CPP_FLAGS = ("-std=c++14",)
+
+
+def binary_path(source_path):
+	"""Where the binary for source_path goes, one per solution so tabs never overwrite each other"""
+	stem = os.path.splitext(os.path.basename(source_path))[0]
+	# Sharded layout: 1900/A.cpp builds to 1900A, not to an A shared by every contest
+	contest = os.path.basename(os.path.dirname(os.path.abspath(source_path)))
+	if contest.isdigit():
+		stem = f"{contest}{stem}"
+	return os.path.join(BUILD_DIR, f"{stem}.exe" if os.name == "nt" else stem)
+
+
+class CompileCache:
+	"""Binaries keyed by a hash of source, compiler version and flags, so an
+	unchanged file is copied out of the cache instead of compiled again"""
+	def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+		self.cache_dir = cache_dir
+		self.max_bytes = max_bytes
+		self.versions = {}
+		self.hits = 0
+		self.misses = 0
+		self.lock = threading.Lock()
+
+	def compiler_version(self, compiler):
+		if compiler not in self.versions:
+			result = subprocess.run([compiler, "--version"], stdout=subprocess.PIPE,
+									stderr=subprocess.STDOUT, text=True)
+			self.versions[compiler] = result.stdout.strip()
+		return self.versions[compiler]
+
+	def key(self, source_path, compiler, flags):
+		h = hashlib.sha256()
+		with open(source_path, "rb") as f:
+			h.update(f.read())
+		h.update(self.compiler_version(compiler).encode())
+		h.update("\0".join(flags).encode())
+		return h.hexdigest()
+
+	def compile(self, source_path, output_path=None, compiler=COMPILER, flags=CPP_FLAGS):
+		"""Returns (returncode, compiler output, whether it was a cache hit)"""
+		output_path = output_path or binary_path(source_path)
+		os.makedirs(self.cache_dir, exist_ok=True)
+		os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+		artifact = os.path.join(self.cache_dir, self.key(source_path, compiler, flags))
+
+		if os.path.isfile(artifact):
+			os.utime(artifact)
+			error = self.copy_out(artifact, output_path)
+			if error:
+				return 1, error, True
+			with self.lock:
+				self.hits += 1
+			return 0, "", True
+
+		tmp_path = f"{artifact}.{threading.get_ident()}.tmp"
+		result = subprocess.run([compiler, *flags, *self.pch_flags(source_path, compiler, flags),
+								 source_path, "-o", tmp_path],
+								stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+		with self.lock:
+			self.misses += 1
+		if result.returncode:
+			return result.returncode, result.stdout, False
+
+		os.replace(tmp_path, artifact)
+		error = self.copy_out(artifact, output_path)
+		self.evict()
+		if error:
+			return 1, result.stdout + error, False
+		return 0, result.stdout, False
+
+	def pch_flags(self, source_path, compiler, flags):
+		header = first_heavy_include(source_path)
+		if header is None:
+			return []
+		return precompiled_headers.include_flags(header, compiler, self.compiler_version(compiler), flags)
+
+	def warm(self, source_path, compiler=COMPILER, flags=CPP_FLAGS):
+		"""Build the PCH for source_path ahead of the first compile, meant for a background thread"""
+		try:
+			if os.path.isfile(source_path):
+				self.pch_flags(source_path, compiler, flags)
+		except OSError:
+			pass
+
+	@staticmethod
+	def copy_out(artifact, output_path):
+		"""Swap the binary in with a rename, writing over it in place fails with "Text file busy"
+		while it runs. Returns an error message when it can't be replaced, None otherwise."""
+		tmp_path = f"{output_path}.{threading.get_ident()}.tmp"
+		shutil.copyfile(artifact, tmp_path)
+		shutil.copymode(artifact, tmp_path)
+		try:
+			os.replace(tmp_path, output_path)
+		except PermissionError:
+			# Windows locks a running executable, even against renames
+			os.remove(tmp_path)
+			return f"{os.path.basename(output_path)} is running, stop it first and compile again.\n"
+		return None
+
+	def evict(self):
+		"""Drop least recently used binaries until the cache fits in max_bytes"""
+		with self.lock:
+			entries = []
+			for name in os.listdir(self.cache_dir):
+				if name.endswith(".tmp"):
+					continue
+				path = os.path.join(self.cache_dir, name)
+				st = os.stat(path)
+				entries.append((st.st_mtime, st.st_size, path))
+			total = sum(size for _, size, _ in entries)
+			for _, size, path in sorted(entries):
+				if total <= self.max_bytes:
+					break
+				try:
+					os.remove(path)
+					total -= size
+				except OSError:
+					pass
+
+	def stats(self):
+		return f"{self.hits} cache hits, {self.misses} misses"
+
+
+compile_cache = CompileCache()
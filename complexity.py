@@ -0,0 +1,115 @@
+import os, math, tempfile
+from harness import run_solution, TIME_LIMIT, MEMORY_LIMIT_MB
+
+MAX_N = 200000
+START_N = 1000
+GROWTH = 2
+# Runs faster than this above the n = 1 baseline are mostly process start-up noise
+MIN_SIGNAL = 0.01
+# Runs stop growing once one takes this many time limits
+STOP_AFTER_TL = 2
+
+EXPONENT_NAMES = ((0.5, "sublinear"), (1.3, "O(n) or O(n log n)"), (1.75, "O(n sqrt n)"),
+				  (2.5, "O(n^2)"), (3.5, "O(n^3)"))
+
+
+def fit_power(points):
+	"""Least-squares fit of y = c * n^k on log-log scale, returns (k, log c)"""
+	xs = [math.log(n) for n, _ in points]
+	ys = [math.log(y) for _, y in points]
+	count = len(points)
+	mean_x, mean_y = sum(xs) / count, sum(ys) / count
+	var_x = sum((x - mean_x) ** 2 for x in xs)
+	k = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+	return k, mean_y - k * mean_x
+
+
+def exponent_name(k):
+	for limit, name in EXPONENT_NAMES:
+		if k < limit:
+			return name
+	return "worse than O(n^3)"
+
+
+class Profile:
+	"""Runtime and memory of one solution over growing n, times in seconds and memory in KB"""
+	def __init__(self, max_n, time_limit, memory_limit_mb):
+		self.max_n = max_n
+		self.time_limit = time_limit
+		self.memory_limit_mb = memory_limit_mb
+		self.baseline = None  # (seconds, KB) at n = 1
+		self.points = []  # (n, seconds, KB, verdict)
+
+	def fit(self, column):
+		"""(exponent, prediction at max_n) of time (column 1) or memory (column 2), None if too little signal"""
+		base = self.baseline[column - 1]
+		floor = MIN_SIGNAL if column == 1 else 1024
+		# Killed runs only give a lower bound, they are left out
+		usable = [(p[0], p[column] - base) for p in self.points
+				  if p[3] == "OK" and p[column] is not None and p[column] - base >= floor]
+		if len(usable) < 2 or usable[0][0] == usable[-1][0]:
+			return None
+		k, log_c = fit_power(usable)
+		return k, base + math.exp(log_c) * self.max_n ** k
+
+	def report(self):
+		lines = [f"{'n':>9}  {'time':>8}  {'memory':>9}  verdict"]
+		for n, seconds, kb, verdict in self.points:
+			memory = f"{kb / 1024:.1f} MB" if kb is not None else "-"
+			lines.append(f"{n:>9}  {seconds:>7.3f}s  {memory:>9}  {verdict}")
+
+		time_fit = self.fit(1)
+		if time_fit is None:
+			lines.append("Too fast to measure a growth rate, add larger sizes or a heavier generator.")
+		else:
+			k, predicted = time_fit
+			verdict = "fits" if predicted <= self.time_limit else "likely TLE"
+			lines.append(f"time ~ n^{k:.2f}, {exponent_name(k)}: {predicted:.3f}s predicted at n = {self.max_n} "
+						 f"against a {self.time_limit:g}s limit, {verdict}")
+
+		memory_fit = self.fit(2) if self.baseline[1] is not None else None
+		if memory_fit is not None:
+			k, predicted = memory_fit
+			verdict = "fits" if predicted <= self.memory_limit_mb * 1024 else "likely MLE"
+			lines.append(f"memory ~ n^{k:.2f}: {predicted / 1024:.1f} MB predicted at n = {self.max_n} "
+						 f"against {self.memory_limit_mb} MB, {verdict}")
+		return "\n".join(lines) + "\n"
+
+
+def measure(gen_cmd, sol_cmd, n, time_limit, memory_limit_mb):
+	# Large inputs go generator -> file -> solution's stdin, never through Python memory
+	fd, input_path = tempfile.mkstemp(suffix=".in")
+	os.close(fd)
+	try:
+		gen = run_solution(gen_cmd + [str(n)], time_limit=max(10.0, time_limit * STOP_AFTER_TL),
+						   spill_to=input_path, display_cap=0)
+		if gen.verdict != "OK":
+			raise RuntimeError(f"generator failed for n = {n}: {gen.summary()}\n{gen.stderr}")
+		result = run_solution(sol_cmd, time_limit=time_limit * STOP_AFTER_TL, memory_limit_mb=memory_limit_mb,
+							  stdin_file=input_path)
+	finally:
+		os.remove(input_path)
+	# CPU time when the OS reports it, it's less noisy than wall time on a busy machine
+	seconds = result.cpu if result.cpu is not None else result.wall
+	return seconds, result.peak_kb, result.verdict
+
+
+def profile(gen_cmd, sol_cmd, max_n=MAX_N, time_limit=TIME_LIMIT, memory_limit_mb=MEMORY_LIMIT_MB,
+			start_n=START_N, growth=GROWTH, on_point=None):
+	"""Run sol_cmd on inputs printed by `gen_cmd n` for n = start_n, start_n * growth, ... up to
+	max_n, stopping early once a run fails or goes past the time limit. on_point gets each
+	(n, seconds, KB, verdict) as it's measured."""
+	report = Profile(max_n, time_limit, memory_limit_mb)
+	seconds, kb, _ = measure(gen_cmd, sol_cmd, 1, time_limit, memory_limit_mb)
+	report.baseline = (seconds, kb)
+
+	n = min(start_n, max_n)
+	while True:
+		point = (n, *measure(gen_cmd, sol_cmd, n, time_limit, memory_limit_mb))
+		report.points.append(point)
+		if on_point:
+			on_point(*point)
+		if n >= max_n or point[3] != "OK" or point[1] > time_limit:
+			break
+		n = min(n * growth, max_n)
+	return report
@@ -0,0 +1,88 @@
+import os, json, time, threading
+from cf_client import cf_client
+
+CONTEST_CACHE_FILE = "contest_cache.json"
+
+# Contests in these phases can still move (start shifted, duration extended),
+# every other phase is final and never needs to be fetched again.
+MUTABLE_PHASES = ("BEFORE", "CODING")
+REFRESH_AFTER = 60
+
+
+class ContestCache:
+	"""Contest metadata kept on disk and looked up by contest id"""
+	def __init__(self, path=CONTEST_CACHE_FILE):
+		self.path = path
+		self.lock = threading.Lock()
+		# Read on first lookup, not at import
+		self.contests = None
+
+	def load(self):
+		if not os.path.isfile(self.path):
+			return {}
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return {}
+
+	def save(self):
+		tmp_path = f"{self.path}.tmp"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self.contests, f)
+		os.replace(tmp_path, self.path)
+
+	@staticmethod
+	def to_entry(c):
+		return {
+			"start": c.get("startTimeSeconds"),
+			"duration": c.get("durationSeconds"),
+			"phase": c.get("phase"),
+			"fetched": int(time.time()),
+		}
+
+	def is_stale(self, entry):
+		if entry["phase"] not in MUTABLE_PHASES:
+			return False
+		return time.time() - entry["fetched"] >= REFRESH_AFTER
+
+	def fetch_one(self, contest_id):
+		"""Fetch a single contest through the standings endpoint, a few hundred bytes
+		instead of the whole contest.list payload"""
+		data = cf_client.call("contest.standings", {"contestId": contest_id, "from": 1, "count": 1})
+		if data["status"] != "OK":
+			return None
+		return data["result"]["contest"]
+
+	def fetch_all(self):
+		data = cf_client.call("contest.list", {"gym": "false"}, timeout=(5, 60))
+		if data["status"] != "OK":
+			return
+		for c in data["result"]:
+			self.contests[f"{c['id']}"] = self.to_entry(c)
+
+	def get(self, contest_id):
+		contest_id = f"{contest_id}"
+		with self.lock:
+			if self.contests is None:
+				self.contests = self.load()
+			entry = self.contests.get(contest_id)
+			if entry is not None and not self.is_stale(entry):
+				return entry
+
+			c = self.fetch_one(contest_id)
+			if c is not None:
+				self.contests[contest_id] = self.to_entry(c)
+			else:
+				self.fetch_all()
+			self.save()
+			return self.contests.get(contest_id)
+
+	def contest_end(self, contest_id):
+		entry = self.get(contest_id)
+		if entry is None or entry["start"] is None:
+			return None
+		return entry["start"] + entry["duration"]
+
+
+contest_cache = ContestCache()
@@ -0,0 +1,50 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from cf_client import cf_client
+from compile_cache import compile_cache
+from solution_layout import solution_path
+
+
+def contest_problems(contest_id):
+	"""Problem ids of a contest in contest order, from a single contest.standings call"""
+	data = cf_client.call("contest.standings", {"contestId": contest_id, "from": 1, "count": 1})
+	if data["status"] != "OK":
+		raise ValueError(data.get("comment", f"Contest {contest_id} wasn't found"))
+	problems = [f"{p['contestId']}{p['index']}" for p in data["result"]["problems"]]
+	if not problems:
+		raise ValueError(f"Contest {contest_id} has no problems yet")
+	return problems
+
+
+def create_from_template(path, lang):
+	"""New solution file from {lang}_template.txt, existing files are left as they are"""
+	if os.path.exists(path):
+		return
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	template = f"{lang}_template.txt"
+	if os.path.exists(template):
+		with open(template, "r") as t, open(path, "w") as cf:
+			cf.write(t.read())
+	else:
+		open(path, "w").close()
+
+
+def prepare_contest(contest_id, repo_dir, lang, layout="flat"):
+	"""Create every problem's file, returns [(prob_id, path)] in contest order"""
+	problems = []
+	for prob_id in contest_problems(contest_id):
+		path = solution_path(repo_dir, prob_id, lang, layout)
+		create_from_template(path, lang)
+		problems.append((prob_id, path))
+	return problems
+
+
+def warm_builds(paths):
+	"""PCH and one real compile first; the other files still hold the same template,
+	so compiling them in parallel afterwards only copies binaries out of the cache"""
+	if not paths:
+		return
+	compile_cache.warm(paths[0])
+	compile_cache.compile(paths[0])
+	with ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as pool:
+		list(pool.map(compile_cache.compile, paths[1:]))
@@ -0,0 +1,78 @@
+import os, json, sqlite3, time
+from contextlib import closing
+
+CONTEST_QUEUE_DB = "contest_queue.db"
+LEGACY_QUEUE_FILE = "contest_queue.json"
+
+
+class ContestQueue:
+	"""Contest solutions waiting for their contest to end, stored in SQLite (WAL)
+	so concurrent enqueue/dequeue never lose entries and a crash can't truncate it"""
+	def __init__(self, path=CONTEST_QUEUE_DB, legacy_path=LEGACY_QUEUE_FILE):
+		self.path = path
+		self.legacy_path = legacy_path
+		self.created = False
+
+	def connect(self):
+		"""The database is only created on first use, so importing this module touches no files"""
+		db = sqlite3.connect(self.path, timeout=10)
+		if not self.created:
+			with db:
+				db.execute("PRAGMA journal_mode=WAL")
+				db.execute(
+					"CREATE TABLE IF NOT EXISTS queue ("
+					"file TEXT PRIMARY KEY, contest_end INTEGER NOT NULL)"
+				)
+				db.execute("CREATE INDEX IF NOT EXISTS queue_contest_end ON queue (contest_end)")
+			self.created = True
+			self.import_legacy(self.legacy_path)
+		return db
+
+	def import_legacy(self, legacy_path):
+		"""Move entries from the old contest_queue.json over, once"""
+		if not os.path.isfile(legacy_path):
+			return
+		try:
+			with open(legacy_path, "r", encoding="utf-8") as f:
+				legacy = json.load(f)
+		except (OSError, ValueError):
+			legacy = {}
+		with closing(self.connect()) as db, db:
+			db.executemany("INSERT OR IGNORE INTO queue VALUES (?, ?)", legacy.items())
+		os.replace(legacy_path, f"{legacy_path}.migrated")
+
+	def enqueue(self, file_name, contest_end):
+		"""True if file_name was newly queued"""
+		with closing(self.connect()) as db, db:
+			cur = db.execute("INSERT OR IGNORE INTO queue VALUES (?, ?)", (file_name, contest_end))
+			return cur.rowcount == 1
+
+	def dequeue(self, file_names):
+		with closing(self.connect()) as db, db:
+			db.executemany("DELETE FROM queue WHERE file = ?", ((f,) for f in file_names))
+
+	def rename(self, old_name, new_name):
+		"""Follow a queued file that moved, e.g. when migrating the repo layout"""
+		with closing(self.connect()) as db, db:
+			db.execute("UPDATE queue SET file = ? WHERE file = ?", (new_name, old_name))
+
+	def ready(self, now=None):
+		"""File names whose contest ended by now"""
+		now = int(time.time()) if now is None else now
+		with closing(self.connect()) as db:
+			rows = db.execute(
+				"SELECT file FROM queue WHERE contest_end <= ? ORDER BY contest_end", (now,)
+			).fetchall()
+		return [row[0] for row in rows]
+
+	def pending_count(self, now=None):
+		now = int(time.time()) if now is None else now
+		with closing(self.connect()) as db:
+			return db.execute("SELECT COUNT(*) FROM queue WHERE contest_end > ?", (now,)).fetchone()[0]
+
+	def contest_ends(self):
+		with closing(self.connect()) as db:
+			return [row[0] for row in db.execute("SELECT DISTINCT contest_end FROM queue")]
+
+
+contest_queue = ContestQueue()
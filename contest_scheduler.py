@@ -0,0 +1,54 @@
+import time, heapq, threading
+
+# A failed push, e.g. while offline, is tried again this many seconds later
+RETRY_DELAY = 300
+
+
+class ContestScheduler(threading.Thread):
+	"""Sleeps until the earliest queued contest end, then calls on_ready once for
+	everything that finished by then and re-arms for the next deadline.
+	When on_ready raises, on_error gets the message and the push is retried after RETRY_DELAY."""
+	def __init__(self):
+		super().__init__(daemon=True)
+		self.deadlines = []
+		self.cond = threading.Condition()
+		self.on_ready = None
+		self.on_error = print
+
+	def start(self, contest_ends, on_ready, on_error=print):
+		self.on_ready = on_ready
+		self.on_error = on_error
+		with self.cond:
+			for contest_end in set(contest_ends):
+				heapq.heappush(self.deadlines, contest_end)
+		super().start()
+
+	def add(self, contest_end):
+		with self.cond:
+			if contest_end in self.deadlines:
+				return
+			heapq.heappush(self.deadlines, contest_end)
+			# Only wake the thread when the new deadline comes first
+			if self.deadlines[0] == contest_end:
+				self.cond.notify()
+
+	def run(self):
+		while True:
+			with self.cond:
+				while not self.deadlines:
+					self.cond.wait()
+				delay = self.deadlines[0] - time.time()
+				if delay > 0:
+					self.cond.wait(delay)
+					continue
+				now = time.time()
+				while self.deadlines and self.deadlines[0] <= now:
+					heapq.heappop(self.deadlines)
+			try:
+				self.on_ready()
+			except Exception as e:
+				self.on_error(f"Contest queue push failed: {e}, retrying in {RETRY_DELAY // 60} minutes\n")
+				self.add(time.time() + RETRY_DELAY)
+
+
+contest_scheduler = ContestScheduler()
@@ -0,0 +1,75 @@
+import os, subprocess, threading
+
+GLOBAL_CONFIGS = (
+	os.path.join(os.path.expanduser("~"), ".gitconfig"),
+	os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.join(os.path.expanduser("~"), ".config")), "git", "config"),
+)
+
+
+def config_mtimes():
+	mtimes = []
+	for path in GLOBAL_CONFIGS:
+		try:
+			mtimes.append(os.stat(path).st_mtime)
+		except OSError:
+			mtimes.append(None)
+	return tuple(mtimes)
+
+
+class GitEnv:
+	"""Git identity, version and remote reachability, probed once and cached.
+	The identity is only looked up again after the global git config changes."""
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.mtimes = None
+		self.name = ""
+		self.email = ""
+		self.version = None
+		self.remote_reachable = None
+
+	@staticmethod
+	def run(*args, cwd=None, timeout=None):
+		try:
+			return subprocess.run(["git", *args], cwd=cwd, stdout=subprocess.PIPE,
+								  stderr=subprocess.DEVNULL, text=True, timeout=timeout)
+		except (OSError, subprocess.TimeoutExpired):
+			return None
+
+	def resolve_identity(self):
+		mtimes = config_mtimes()
+		if mtimes == self.mtimes:
+			return
+		result = self.run("config", "--global", "--get-regexp", r"^user\.(name|email)$")
+		name = email = ""
+		for line in (result.stdout.splitlines() if result else []):
+			key, _, value = line.partition(" ")
+			if key == "user.name":
+				name = value.strip()
+			elif key == "user.email":
+				email = value.strip()
+		self.name, self.email, self.mtimes = name, email, mtimes
+
+	def probe(self, repo_dir=None):
+		"""Everything at once, slow because of the network check, meant for a background thread"""
+		with self.lock:
+			self.resolve_identity()
+		result = self.run("--version")
+		self.version = result.stdout.strip() if result else None
+		if repo_dir and os.path.isdir(repo_dir):
+			result = self.run("ls-remote", "--exit-code", "--heads", "origin", cwd=repo_dir, timeout=15)
+			self.remote_reachable = result is not None and result.returncode == 0
+
+	def start(self, repo_dir=None, on_done=None):
+		def worker():
+			self.probe(repo_dir)
+			if on_done:
+				on_done(self)
+		threading.Thread(target=worker, daemon=True).start()
+
+	def is_logged_in(self):
+		with self.lock:
+			self.resolve_identity()
+			return bool(self.name) and bool(self.email)
+
+
+git_env = GitEnv()
@@ -0,0 +1,152 @@
+import os, time, queue, subprocess, threading
+from repo_clone import widen_sparse_checkout
+
+
+class GitJob:
+	"""Files to commit for one push request, finished_callback gets whether the push went through"""
+	def __init__(self, files, message, output_callback=None, finished_callback=None):
+		self.files = list(files)
+		self.message = message
+		self.output_callback = output_callback or print
+		self.finished_callback = finished_callback
+		self.success = False
+		self.done = threading.Event()
+
+	def wait(self, timeout=None):
+		self.done.wait(timeout)
+		return self.success
+
+
+class GitWorker(threading.Thread):
+	"""The only thread running git in one repository. Jobs queued while a push
+	is in flight are merged into a single add/commit/pull/push cycle.
+
+	With batch_window > 0 the worker also holds on to the first job for that
+	many seconds, so every solve pushed in the meantime lands in the same commit."""
+	def __init__(self, repo_dir, batch_window=0):
+		super().__init__(daemon=True)
+		self.repo_dir = os.path.abspath(repo_dir)
+		self.batch_window = batch_window
+		self.jobs = queue.Queue()
+
+	def submit(self, files, message, output_callback=None, finished_callback=None):
+		job = GitJob(files, message, output_callback, finished_callback)
+		self.jobs.put(job)
+		return job
+
+	def git(self, *args):
+		return subprocess.run(["git", *args], cwd=self.repo_dir,
+							  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+	def flush(self, timeout=None):
+		"""Push whatever is waiting for the batch window right now and wait for it"""
+		flushed = threading.Event()
+		self.jobs.put(flushed)
+		return flushed.wait(timeout)
+
+	def collect(self):
+		batch, flushes = [], []
+		item = self.jobs.get()
+		deadline = time.monotonic() + self.batch_window
+		while True:
+			if isinstance(item, threading.Event):
+				flushes.append(item)
+			else:
+				batch.append(item)
+			remaining = deadline - time.monotonic()
+			try:
+				if flushes or remaining <= 0:
+					item = self.jobs.get_nowait()
+				else:
+					item = self.jobs.get(timeout=remaining)
+			except queue.Empty:
+				return batch, flushes
+
+	def run(self):
+		while True:
+			batch, flushes = self.collect()
+			if batch:
+				self.process(batch)
+			for flushed in flushes:
+				flushed.set()
+
+	def remote_moved(self):
+		"""False when origin/main still matches the remote, so the pull can be skipped"""
+		remote = self.git("ls-remote", "origin", "refs/heads/main")
+		local = self.git("rev-parse", "refs/remotes/origin/main")
+		if remote.returncode or local.returncode or not remote.stdout.strip():
+			return True
+		return remote.stdout.split()[0] != local.stdout.strip()
+
+	def process(self, batch):
+		# Every front-end logs to a single pane, report the merged cycle once
+		emit = batch[-1].output_callback
+		files = list(dict.fromkeys(f for job in batch for f in job.files))
+		message = "; ".join(dict.fromkeys(job.message for job in batch))
+		success = False
+		try:
+			emit(f"Adding {', '.join(files)}...\n")
+			widen_sparse_checkout(self.repo_dir, files)
+			result = self.git("add", "--", *files)
+			if result.returncode:
+				emit(result.stdout)
+				return
+
+			emit(f"Committing '{message}'...\n")
+			result = self.git("commit", "-m", message)
+			# Nothing to commit is fine, e.g. a solve pushed twice; anything else would push nothing
+			if result.returncode and "nothing to commit" not in result.stdout:
+				emit(result.stdout)
+				return
+
+			if self.remote_moved():
+				emit("Pulling latest changes...\n")
+				result = self.git("pull", "--rebase", "--autostash")
+				if result.returncode:
+					emit(result.stdout)
+			else:
+				emit("Remote unchanged, skipping pull.\n")
+
+			emit("Pushing to GitHub...\n")
+			result = self.git("push", "origin", "main")
+			if result.returncode:
+				emit(result.stdout)
+			success = result.returncode == 0
+		except Exception as e:
+			emit(f"Error: {str(e)}\n")
+		finally:
+			for job in batch:
+				job.success = success
+				job.done.set()
+				if job.finished_callback:
+					job.finished_callback(success)
+
+
+workers = {}
+workers_lock = threading.Lock()
+
+
+def get_git_worker(repo_dir, batch_window=None):
+	"""Shared worker for repo_dir, started on first use"""
+	key = os.path.abspath(repo_dir)
+	with workers_lock:
+		worker = workers.get(key)
+		if worker is None:
+			worker = workers[key] = GitWorker(key)
+			worker.start()
+		if batch_window is not None:
+			worker.batch_window = batch_window
+		return worker
+
+
+def flush_git_workers(timeout=None):
+	"""Push every batch still waiting, meant to be called right before the app quits.
+	timeout bounds the whole flush; returns False when a push was still running at the end."""
+	with workers_lock:
+		running = list(workers.values())
+	deadline = None if timeout is None else time.monotonic() + timeout
+	flushed = True
+	for worker in running:
+		remaining = None if deadline is None else max(0, deadline - time.monotonic())
+		flushed = worker.flush(remaining) and flushed
+	return flushed
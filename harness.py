@@ -0,0 +1,289 @@
+import os, codecs, signal, struct, subprocess, threading, time
+from compile_cache import binary_path
+from process_tree import popen_group, kill_tree
+from checker import compare_output
+
+try:
+	import resource
+except ImportError:  # Windows: no rlimits, no rusage
+	resource = None
+
+# Codeforces defaults
+TIME_LIMIT = 1.0
+MEMORY_LIMIT_MB = 256
+OUTPUT_LIMIT_MB = 64
+# How much of a run's stdout is kept in memory for display, the rest only goes to the spill file
+DISPLAY_CAP_KB = 64
+SPILL_DIR = ".cfmt_output"
+
+MEMORY_ERRORS = ("std::bad_alloc", "MemoryError")
+# The address space limit is only a safety net: allocators and loaders reserve far more than
+# they touch, so MLE is judged on peak resident memory and the rlimit sits this much higher
+ADDRESS_SPACE_FACTOR = 4
+
+
+def spill_path(solve_folder, prob_id):
+	"""File holding a run's full stdout, kept out of git through .git/info/exclude"""
+	spill_dir = os.path.join(solve_folder, SPILL_DIR)
+	os.makedirs(spill_dir, exist_ok=True)
+	exclude = os.path.join(solve_folder, ".git", "info", "exclude")
+	if os.path.isdir(os.path.dirname(exclude)):
+		lines = []
+		if os.path.isfile(exclude):
+			with open(exclude, "r", encoding="utf-8") as f:
+				lines = f.read().splitlines()
+		if f"{SPILL_DIR}/" not in lines:
+			with open(exclude, "a", encoding="utf-8") as f:
+				f.write(f"\n{SPILL_DIR}/\n")
+	return os.path.join(spill_dir, f"{prob_id}.out")
+
+
+def solution_command(lang, file_path):
+	if lang == "cpp":
+		return [binary_path(file_path)]
+	return ["python", file_path]
+
+
+class RunResult:
+	"""Outcome of one judged run, times in seconds and memory in KB (None where the OS can't tell)"""
+	def __init__(self, verdict, returncode, stdout, stderr, wall, cpu, peak_kb):
+		self.verdict = verdict
+		self.returncode = returncode
+		self.stdout = stdout
+		self.stderr = stderr
+		self.wall = wall
+		self.cpu = cpu
+		self.peak_kb = peak_kb
+		self.message = ""
+		self.stdout_bytes = len(stdout)
+
+	def summary(self):
+		parts = [f"{self.verdict}", f"wall {self.wall:.3f}s"]
+		if self.cpu is not None:
+			parts.append(f"cpu {self.cpu:.3f}s")
+		if self.peak_kb is not None:
+			parts.append(f"mem {self.peak_kb / 1024:.1f} MB")
+		if self.verdict == "RE":
+			parts.append(f"exit code {self.returncode}")
+		if self.message:
+			parts.append(self.message)
+		return " | ".join(parts)
+
+
+def static_memory_kb(path):
+	"""Memory an ELF binary maps at load (code, data and bss, i.e. global arrays), None if it isn't one"""
+	try:
+		with open(path, "rb") as f:
+			header = f.read(64)
+			if header[:4] != b"\x7fELF":
+				return None
+			order = "<" if header[5] == 1 else ">"
+			if header[4] == 2:
+				phoff, = struct.unpack_from(order + "Q", header, 0x20)
+				phentsize, phnum = struct.unpack_from(order + "HH", header, 0x36)
+				memsz_at, memsz_fmt = 0x28, "Q"
+			else:
+				phoff, = struct.unpack_from(order + "I", header, 0x1C)
+				phentsize, phnum = struct.unpack_from(order + "HH", header, 0x2A)
+				memsz_at, memsz_fmt = 0x14, "I"
+			f.seek(phoff)
+			table = f.read(phentsize * phnum)
+	except (OSError, struct.error):
+		return None
+	total = 0
+	for i in range(phnum):
+		entry = table[i * phentsize:(i + 1) * phentsize]
+		if len(entry) < phentsize:
+			break
+		p_type, = struct.unpack_from(order + "I", entry, 0)
+		if p_type == 1:  # PT_LOAD
+			total += struct.unpack_from(order + memsz_fmt, entry, memsz_at)[0]
+	return total // 1024
+
+
+def limit_setter(time_limit, memory_limit_mb, output_limit_mb):
+	"""preexec_fn applying the limits inside the child before exec"""
+	def set_limits():
+		if time_limit is not None:
+			cpu = int(time_limit) + 1
+			resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+		if memory_limit_mb is not None:
+			memory = memory_limit_mb * 1024 * 1024 * ADDRESS_SPACE_FACTOR
+			resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+		output = output_limit_mb * 1024 * 1024
+		resource.setrlimit(resource.RLIMIT_FSIZE, (output, output))
+	return set_limits
+
+
+def run_solution(cmd, stdin_data="", time_limit=TIME_LIMIT, memory_limit_mb=MEMORY_LIMIT_MB,
+				 output_limit_mb=OUTPUT_LIMIT_MB, on_start=None, on_output=None,
+				 spill_to=None, display_cap=None, stdin_file=None):
+	"""Run cmd under Codeforces-style limits and return a RunResult.
+	on_start gets the Popen right after launch, e.g. to let a Stop button kill it.
+	on_output gets stdout text as it arrives, at most display_cap bytes of it; the
+	whole stdout is written to spill_to when given, and only the displayed part is
+	kept in RunResult.stdout. stdin_file replaces stdin_data: the file is handed to
+	the child as its stdin descriptor, so huge inputs never pass through Python.
+	A time_limit or memory_limit_mb of None leaves that resource unlimited and
+	never judged, for plain runs the user stops by hand."""
+	preexec_fn = limit_setter(time_limit, memory_limit_mb, output_limit_mb) if resource else None
+	stdin = open(stdin_file, "rb") if stdin_file else subprocess.PIPE
+	start = time.monotonic()
+	try:
+		process = popen_group(cmd, stdin=stdin, stdout=subprocess.PIPE,
+							  stderr=subprocess.PIPE, preexec_fn=preexec_fn)
+	finally:
+		# The child holds its own copy of the descriptor
+		if stdin_file:
+			stdin.close()
+	if on_start:
+		on_start(process)
+
+	output_cap = output_limit_mb * 1024 * 1024
+	chunks = {"stdout": [], "stderr": []}
+	totals = {"stdout": 0, "stderr": 0}
+	spill = open(spill_to, "wb") if spill_to else None
+	flags = {"timed_out": False, "overflow": False}
+
+	def feed():
+		try:
+			process.stdin.write(stdin_data.encode())
+		except (BrokenPipeError, OSError):
+			pass
+		finally:
+			try:
+				process.stdin.close()
+			except OSError:
+				pass
+
+	def drain(stream, name):
+		decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+		kept = 0
+		for chunk in iter(lambda: stream.read1(65536), b""):
+			totals[name] += len(chunk)
+			if totals[name] > output_cap:
+				flags["overflow"] = True
+				kill_tree(process)
+				break
+			if spill and name == "stdout":
+				spill.write(chunk)
+			# stderr is never capped, the MLE check looks for allocation errors in it
+			if display_cap is not None and name == "stdout":
+				chunk = chunk[:max(0, display_cap - kept)]
+				if not chunk:
+					continue
+			kept += len(chunk)
+			chunks[name].append(chunk)
+			if on_output and name == "stdout":
+				on_output(decoder.decode(chunk))
+
+	def on_timeout():
+		flags["timed_out"] = True
+		kill_tree(process)
+
+	pumps = [
+		threading.Thread(target=drain, args=(process.stdout, "stdout"), daemon=True),
+		threading.Thread(target=drain, args=(process.stderr, "stderr"), daemon=True),
+	]
+	if not stdin_file:
+		pumps.append(threading.Thread(target=feed, daemon=True))
+	for t in pumps:
+		t.start()
+
+	timer = None
+	if time_limit is not None:
+		timer = threading.Timer(max(2 * time_limit, time_limit + 1), on_timeout)
+		timer.start()
+	cpu = peak_kb = None
+	try:
+		if resource:
+			_, status, usage = os.wait4(process.pid, 0)
+			process.returncode = os.waitstatus_to_exitcode(status)
+			cpu = usage.ru_utime + usage.ru_stime
+			# ru_maxrss is in bytes on macOS, KB everywhere else
+			peak_kb = usage.ru_maxrss // 1024 if os.uname().sysname == "Darwin" else usage.ru_maxrss
+		else:
+			process.wait()
+	finally:
+		if timer:
+			timer.cancel()
+	wall = time.monotonic() - start
+	for t in pumps:
+		t.join(1)
+	if spill:
+		spill.close()
+
+	# Global arrays count like Codeforces counts them, whether they are touched or not
+	static_kb = static_memory_kb(cmd[0]) if memory_limit_mb is not None else None
+	stdout = b"".join(chunks["stdout"]).decode(errors="replace")
+	stderr = b"".join(chunks["stderr"]).decode(errors="replace")
+	returncode = process.returncode
+
+	if flags["overflow"]:
+		verdict = "OLE"
+	elif time_limit is not None and (flags["timed_out"] or (cpu is not None and cpu > time_limit)
+			or (cpu is None and wall > time_limit)
+			or returncode == -getattr(signal, "SIGXCPU", 0)):
+		verdict = "TLE"
+	elif memory_limit_mb is not None and ((peak_kb is not None and peak_kb > memory_limit_mb * 1024)
+			or (static_kb is not None and static_kb > memory_limit_mb * 1024)
+			or (returncode != 0 and any(e in stderr for e in MEMORY_ERRORS))):
+		verdict = "MLE"
+	elif returncode != 0:
+		verdict = "RE"
+	else:
+		verdict = "OK"
+	result = RunResult(verdict, returncode, stdout, stderr, wall, cpu, peak_kb)
+	result.stdout_bytes = totals["stdout"]
+	return result
+
+
+def judge_test(cmd, stdin_data, expected, time_limit=TIME_LIMIT, memory_limit_mb=MEMORY_LIMIT_MB, eps=None,
+			   stdin_file=None):
+	"""One test: run it, then check the output when it ran cleanly and an answer is known"""
+	result = run_solution(cmd, stdin_data, time_limit, memory_limit_mb, stdin_file=stdin_file)
+	if result.verdict == "OK" and expected is not None:
+		ok, message = compare_output(expected, result.stdout, eps)
+		if not ok:
+			result.verdict = "WA"
+			result.message = message
+	return result
+
+
+test_pool = None
+
+
+def get_test_pool():
+	# spawn, not fork: the GUIs call this from a process that already runs threads
+	global test_pool
+	if test_pool is None:
+		import multiprocessing
+		from concurrent.futures import ProcessPoolExecutor
+		test_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2,
+										mp_context=multiprocessing.get_context("spawn"))
+	return test_pool
+
+
+def shutdown_test_pool():
+	"""Drop queued tests and let the workers exit after their current one, for quitting"""
+	if test_pool is not None:
+		test_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_tests(cmd, tests, time_limit=TIME_LIMIT, memory_limit_mb=MEMORY_LIMIT_MB, eps=None):
+	"""Judge every {"input" or "input_file", "expected"} test in parallel, results come back in test order"""
+	pool = get_test_pool()
+	futures = [pool.submit(judge_test, cmd, t.get("input", ""), t.get("expected"), time_limit, memory_limit_mb, eps,
+						   t.get("input_file"))
+			   for t in tests]
+	return [f.result() for f in futures]
+
+
+def results_table(results):
+	lines = [f"{'#':>3}  {'verdict':<7}  {'time':>8}  {'memory':>9}  details"]
+	for idx, r in enumerate(results, 1):
+		memory = f"{r.peak_kb / 1024:.1f} MB" if r.peak_kb is not None else "-"
+		lines.append(f"{idx:>3}  {r.verdict:<7}  {r.wall:>7.3f}s  {memory:>9}  {r.message}")
+	passed = sum(r.verdict == "OK" for r in results)
+	lines.append(f"{passed}/{len(results)} passed")
+	return "\n".join(lines) + "\n"
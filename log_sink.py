@@ -0,0 +1,49 @@
+import threading
+
+FLUSH_INTERVAL_MS = 50
+MAX_LOG_LINES = 5000
+
+
+class LogSink:
+	"""Thread-safe message buffer in front of a log widget. write() can be called
+	from any thread; the GUI drains everything queued with take() on a timer."""
+	def __init__(self):
+		self.pending = []
+		self.lock = threading.Lock()
+
+	def write(self, text):
+		with self.lock:
+			self.pending.append(text)
+
+	def take(self):
+		with self.lock:
+			if not self.pending:
+				return ""
+			text = "".join(self.pending)
+			self.pending.clear()
+		return text
+
+
+class TkLogSink(LogSink):
+	"""Drains into a tk.Text every interval_ms with one insert, keeping at most max_lines"""
+	def __init__(self, root, text_widget, max_lines=MAX_LOG_LINES, interval_ms=FLUSH_INTERVAL_MS):
+		super().__init__()
+		self.root = root
+		self.text_widget = text_widget
+		self.max_lines = max_lines
+		self.interval_ms = interval_ms
+		self.root.after(self.interval_ms, self.flush)
+
+	def flush(self):
+		text = self.take()
+		if text:
+			widget = self.text_widget
+			widget.config(state="normal")
+			widget.insert("end", text)
+			lines = int(widget.index("end-1c").split(".")[0])
+			# Trim in steps of 10% so a busy log isn't trimmed on every flush
+			if lines > self.max_lines * 1.1:
+				widget.delete("1.0", f"{lines - self.max_lines + 1}.0")
+			widget.see("end")
+			widget.config(state="disabled")
+		self.root.after(self.interval_ms, self.flush)
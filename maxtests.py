@@ -0,0 +1,176 @@
+"""Max-constraint test generators writing straight to a file.
+Usable from a generator script, or as python maxtests.py OUT_FILE KIND ARGS... [--tests T] [--seed S]"""
+import random, string, sys
+
+BUFFER_SIZE = 1 << 20
+# Values are joined and written this many at a time, so a 10^6 element line never exists as one string
+CHUNK = 1 << 15
+
+
+class TestFile:
+	"""Buffered text writer for one generated test"""
+	def __init__(self, path):
+		self.f = open(path, "w", encoding="ascii", newline="\n", buffering=BUFFER_SIZE)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.f.close()
+
+	def line(self, *values):
+		self.f.write(" ".join(map(str, values)) + "\n")
+
+	def row(self, values):
+		"""All values on one line"""
+		values = list(values)
+		for i in range(0, len(values), CHUNK):
+			if i:
+				self.f.write(" ")
+			self.f.write(" ".join(map(str, values[i:i + CHUNK])))
+		self.f.write("\n")
+
+	def pairs(self, pairs):
+		"""One "u v" line per pair, e.g. edges"""
+		pairs = list(pairs)
+		for i in range(0, len(pairs), CHUNK):
+			self.f.writelines(f"{u} {v}\n" for u, v in pairs[i:i + CHUNK])
+
+
+def array(n, lo, hi, rng=random):
+	# choices() over a range is several times faster than n randint() calls
+	return rng.choices(range(lo, hi + 1), k=n)
+
+
+def permutation(n, rng=random):
+	p = list(range(1, n + 1))
+	rng.shuffle(p)
+	return p
+
+
+def tree(n, rng=random, shape="random"):
+	"""n - 1 edges of a tree on 1..n with shuffled labels: random, path (deepest) or star (widest)"""
+	if shape == "path":
+		parents = [(v, v - 1) for v in range(2, n + 1)]
+	elif shape == "star":
+		parents = [(v, 1) for v in range(2, n + 1)]
+	else:
+		parents = [(v, rng.randint(1, v - 1)) for v in range(2, n + 1)]
+	label = [0] + permutation(n, rng)
+	edges = [(label[u], label[v]) for u, v in parents]
+	rng.shuffle(edges)
+	return edges
+
+
+def graph(n, m, rng=random, connected=True):
+	"""m edges of a simple graph on 1..n, no loops or multi-edges, spanning tree first when connected"""
+	if m > n * (n - 1) // 2 or (connected and m < n - 1):
+		raise ValueError(f"no simple{' connected' if connected else ''} graph has {n} vertices and {m} edges")
+	edges = tree(n, rng) if connected else []
+	# Pairs packed into one int, far lighter than a set of tuples at 10^6 edges
+	seen = {min(u, v) * (n + 1) + max(u, v) for u, v in edges}
+	vertices = range(1, n + 1)
+	while len(edges) < m:
+		# Endpoints drawn in bulk, with some slack for the pairs that get rejected
+		batch = m - len(edges) + 16
+		for u, v in zip(rng.choices(vertices, k=batch), rng.choices(vertices, k=batch)):
+			key = min(u, v) * (n + 1) + max(u, v)
+			if u != v and key not in seen:
+				seen.add(key)
+				edges.append((u, v))
+				if len(edges) == m:
+					break
+	rng.shuffle(edges)
+	return edges
+
+
+def text(n, rng=random, alphabet=string.ascii_lowercase):
+	return "".join(rng.choices(alphabet, k=n))
+
+
+def split_total(total, t, rng=random):
+	"""t sizes, each at least 1, summing to total: the usual "sum of n over all tests" constraint"""
+	if t > total:
+		raise ValueError(f"can't split {total} into {t} non-empty tests")
+	cuts = sorted(rng.sample(range(1, total), t - 1))
+	return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+
+def multitest(out, t, total, write_case, rng=random):
+	"""Writes t, then calls write_case(out, n, rng) for each test, n summing to total"""
+	out.line(t)
+	for n in split_total(total, t, rng):
+		write_case(out, n, rng)
+
+
+def split_edges(total, sizes):
+	"""Edge counts for graphs of the given sizes, shared out in proportion to n, each at
+	least n - 1 so it can be connected and at most n(n-1)/2 so it stays simple"""
+	low = [n - 1 for n in sizes]
+	high = [n * (n - 1) // 2 for n in sizes]
+	if total < sum(low):
+		raise ValueError(f"{total} edges can't connect {len(sizes)} graphs on {sum(sizes)} vertices, "
+						 f"at least {sum(low)} are needed")
+	n_total = sum(sizes)
+	edges = [min(hi, max(lo, total * n // n_total)) for n, lo, hi in zip(sizes, low, high)]
+	# Rounding and the caps leave some edges over, the biggest graphs take them while they have room
+	left = total - sum(edges)
+	for i in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+		if left <= 0:
+			break
+		extra = min(left, high[i] - edges[i])
+		edges[i] += extra
+		left -= extra
+	return edges
+
+
+def graph_case(out, n, rng, m):
+	out.line(n, m)
+	out.pairs(graph(n, m, rng))
+
+
+CASES = {
+	"array": lambda out, n, rng, lo=1, hi=10 ** 9: (out.line(n), out.row(array(n, int(lo), int(hi), rng))),
+	"permutation": lambda out, n, rng: (out.line(n), out.row(permutation(n, rng))),
+	"tree": lambda out, n, rng, shape="random": (out.line(n), out.pairs(tree(n, rng, shape))),
+	"graph": lambda out, n, rng, m=None: graph_case(out, n, rng, int(m) if m else min(n, n * (n - 1) // 2)),
+	"string": lambda out, n, rng: (out.line(n), out.line(text(n, rng))),
+}
+
+
+def main(argv):
+	args = list(argv)
+	options = {"--tests": None, "--seed": None}
+	for flag in options:
+		if flag in args:
+			i = args.index(flag)
+			options[flag] = int(args[i + 1])
+			del args[i:i + 2]
+	if len(args) < 3 or args[1] not in CASES:
+		print(__doc__.strip())
+		print(f"KIND: {', '.join(CASES)}, first ARG is n (the total n with --tests), e.g.\n"
+			  f"  python maxtests.py big.txt array 200000 1 1000000000\n"
+			  f"  python maxtests.py big.txt graph 200000 1000000\n"
+			  f"  python maxtests.py big.txt tree 200000 path --tests 10000\n"
+			  f"  python maxtests.py big.txt graph 200000 1000000 --tests 10000  (m is split across tests too)")
+		return 1
+
+	path, kind, n, extra = args[0], args[1], int(float(args[2])), args[3:]
+	rng = random.Random(options["--seed"])
+	write_case = lambda out, size, r: CASES[kind](out, size, r, *extra)
+	with TestFile(path) as out:
+		if options["--tests"] and kind == "graph" and extra:
+			# m is a total over all tests too, every test gets its share
+			sizes = split_total(n, options["--tests"], rng)
+			out.line(len(sizes))
+			for size, m in zip(sizes, split_edges(int(float(extra[0])), sizes)):
+				graph_case(out, size, rng, m)
+		elif options["--tests"]:
+			multitest(out, options["--tests"], n, write_case, rng)
+		else:
+			write_case(out, n, rng)
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
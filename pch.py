@@ -0,0 +1,76 @@
+import os, re, shutil, hashlib, subprocess, threading
+
+PCH_DIR = os.path.join(".cfmt_cache", "pch")
+
+# Headers that take most of a compile to parse. GCC only picks a precompiled
+# header up for the first #include of a file, so only that one is checked.
+HEAVY_HEADERS = ("bits/stdc++.h", "bits/extc++.h")
+
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s*[<"]([^>"]+)[>"]', re.MULTILINE)
+
+
+def first_heavy_include(source_path):
+	with open(source_path, "r", encoding="utf-8", errors="replace") as f:
+		m = INCLUDE_RE.search(f.read())
+	if m and m.group(1) in HEAVY_HEADERS:
+		return m.group(1)
+	return None
+
+
+class PrecompiledHeaders:
+	"""Builds <header>.gch once per compiler version, header and flag set and hands
+	back the -I flag that makes g++ use it. A .gch built with other flags is
+	silently ignored by g++, so a stale one never breaks a compile."""
+	def __init__(self, pch_dir=PCH_DIR):
+		self.pch_dir = pch_dir
+		self.lock = threading.Lock()
+		self.failed = set()
+
+	@staticmethod
+	def prefix(header):
+		return header.replace("/", "_").replace("+", "p") + "-"
+
+	def key(self, header, compiler_version, flags):
+		h = hashlib.sha256()
+		h.update(header.encode())
+		h.update(compiler_version.encode())
+		h.update("\0".join(flags).encode())
+		return self.prefix(header) + h.hexdigest()[:16]
+
+	def include_flags(self, header, compiler, compiler_version, flags):
+		"""Flags to add to a compile so it uses the PCH, building it first if needed"""
+		if "clang" in compiler_version.lower():
+			return []
+		root = os.path.join(self.pch_dir, self.key(header, compiler_version, flags))
+		gch_path = os.path.join(root, f"{header}.gch")
+
+		with self.lock:
+			if root in self.failed:
+				return []
+			if not os.path.isfile(gch_path) and not self.build(header, compiler, flags, root, gch_path):
+				self.failed.add(root)
+				return []
+		return ["-I", root]
+
+	def build(self, header, compiler, flags, root, gch_path):
+		# Builds of this header for an older compiler or flag set are never used again
+		if os.path.isdir(self.pch_dir):
+			for name in os.listdir(self.pch_dir):
+				if name.startswith(self.prefix(header)):
+					shutil.rmtree(os.path.join(self.pch_dir, name), ignore_errors=True)
+
+		os.makedirs(os.path.dirname(gch_path), exist_ok=True)
+		wrapper = os.path.join(root, "pch_wrapper.h")
+		with open(wrapper, "w") as f:
+			f.write(f"#include <{header}>\n")
+
+		tmp_path = f"{gch_path}.tmp"
+		result = subprocess.run([compiler, *flags, "-x", "c++-header", wrapper, "-o", tmp_path],
+								stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+		if result.returncode:
+			return False
+		os.replace(tmp_path, gch_path)
+		return True
+
+
+precompiled_headers = PrecompiledHeaders()
@@ -0,0 +1,24 @@
+import os, signal, subprocess
+
+
+def popen_group(cmd, **kwargs):
+	"""Popen in its own process group, so kill_tree() also reaches anything it spawned"""
+	if os.name == "nt":
+		kwargs.setdefault("creationflags", subprocess.CREATE_NEW_PROCESS_GROUP)
+	else:
+		kwargs.setdefault("start_new_session", True)
+	return subprocess.Popen(cmd, **kwargs)
+
+
+def kill_tree(process):
+	# No poll() here: it would reap the child behind the back of callers waiting on it with os.wait4
+	if process.returncode is not None:
+		return
+	try:
+		if os.name == "nt":
+			subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+						   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+		else:
+			os.killpg(process.pid, signal.SIGKILL)
+	except OSError:
+		pass
@@ -0,0 +1,49 @@
+import subprocess
+
+# full: plain clone. partial: blobless, old file contents are downloaded only when
+# needed. shallow: partial plus only the last SHALLOW_DEPTH commits of history.
+CLONE_MODES = ("full", "partial", "shallow")
+SHALLOW_DEPTH = 50
+# partial and shallow clones only check out root-level files and the newest numbered directories
+SPARSE_RECENT_DIRS = 3
+
+
+def git(*args, cwd=None):
+	return subprocess.run(["git", *args], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+
+def recent_dirs(repo_dir, count=SPARSE_RECENT_DIRS):
+	"""Newest numbered top-level directories, i.e. the latest contest shards"""
+	result = git("ls-tree", "-d", "--name-only", "HEAD", cwd=repo_dir)
+	if result.returncode:
+		return []
+	numbered = [name for name in result.stdout.split() if name.isdigit()]
+	return sorted(numbered, key=int)[-count:]
+
+
+def clone_repo(github_username, repo_name, mode="full", depth=SHALLOW_DEPTH):
+	"""Clone github.com/{github_username}/{repo_name} into ./repo_name, returns git's exit code"""
+	url = f"https://github.com/{github_username}/{repo_name}.git"
+	if mode not in CLONE_MODES[1:]:
+		return subprocess.run(["git", "clone", url, repo_name]).returncode
+
+	cmd = ["git", "clone", "--filter=blob:none", "--no-checkout"]
+	if mode == "shallow":
+		cmd += ["--depth", str(depth)]
+	returncode = subprocess.run(cmd + [url, repo_name]).returncode
+	if returncode:
+		return returncode
+
+	# Cone mode keeps every root-level file, so a flat layout is checked out entirely
+	git("sparse-checkout", "init", "--cone", cwd=repo_name)
+	git("sparse-checkout", "set", *recent_dirs(repo_name), cwd=repo_name)
+	return subprocess.run(["git", "checkout"], cwd=repo_name).returncode
+
+
+def widen_sparse_checkout(repo_dir, files):
+	"""Add the directories of files to a sparse checkout, git add refuses paths outside of it"""
+	if git("config", "--get", "core.sparseCheckout", cwd=repo_dir).stdout.strip() != "true":
+		return
+	dirs = sorted({f.replace("\\", "/").rsplit("/", 1)[0] for f in files if "/" in f.replace("\\", "/")})
+	if dirs:
+		git("sparse-checkout", "add", *dirs, cwd=repo_dir)
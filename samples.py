@@ -0,0 +1,120 @@
+import os, json, threading
+from html.parser import HTMLParser
+from solution_layout import PROB_ID_RE
+
+SAMPLE_CACHE_DIR = os.path.join(".cfmt_cache", "samples")
+PROBLEM_HOST = "https://codeforces.com"
+# Contest ids from here on are gyms, with their own URL
+GYM_IDS_FROM = 100000
+
+
+class SampleParser(HTMLParser):
+	"""Collects the <pre> of every div.input / div.output of a problem statement.
+	Codeforces writes sample lines either separated by <br> or as one <div> per line."""
+	def __init__(self):
+		super().__init__()
+		self.kind = None
+		self.text = None
+		self.inputs = []
+		self.outputs = []
+
+	def handle_starttag(self, tag, attrs):
+		if self.text is not None:
+			if tag == "br":
+				self.text.append("\n")
+			return
+		if tag == "div":
+			classes = (dict(attrs).get("class") or "").split()
+			if "input" in classes or "output" in classes:
+				self.kind = "input" if "input" in classes else "output"
+		elif tag == "pre" and self.kind:
+			self.text = []
+
+	def handle_endtag(self, tag):
+		if self.text is None:
+			return
+		if tag == "div":
+			self.text.append("\n")
+		elif tag == "pre":
+			lines = "".join(self.text).replace("\r", "").split("\n")
+			sample = "\n".join(line.rstrip() for line in lines).strip("\n") + "\n"
+			(self.inputs if self.kind == "input" else self.outputs).append(sample)
+			self.kind = self.text = None
+
+	def handle_data(self, data):
+		if self.text is not None:
+			self.text.append(data)
+
+
+def parse_samples(html):
+	"""[{"input", "expected"}] from a problem page"""
+	parser = SampleParser()
+	parser.feed(html)
+	return [{"input": i, "expected": o} for i, o in zip(parser.inputs, parser.outputs)]
+
+
+class HttpSource:
+	"""Problem pages over HTTP, base_url can point at a local stand-in server"""
+	def __init__(self, base_url=PROBLEM_HOST, timeout=(5, 20)):
+		self.base_url = base_url.rstrip("/")
+		self.timeout = timeout
+
+	def url(self, contest_id, index):
+		section = "gym" if contest_id >= GYM_IDS_FROM else "contest"
+		return f"{self.base_url}/{section}/{contest_id}/problem/{index}"
+
+	def fetch(self, contest_id, index):
+		# Same rate limit and retries as the API, a contest start asks for every page at once
+		from cf_client import cf_client
+		return cf_client.get(self.url(contest_id, index), timeout=self.timeout)
+
+
+class SampleFetcher:
+	"""Sample tests per problem id, fetched from source once and cached on disk"""
+	def __init__(self, source=None, cache_dir=SAMPLE_CACHE_DIR):
+		self.source = source or HttpSource()
+		self.cache_dir = cache_dir
+		self.lock = threading.Lock()
+		self.fetching = {}
+
+	def cache_path(self, prob_id):
+		return os.path.join(self.cache_dir, f"{prob_id}.json")
+
+	def cached(self, prob_id):
+		"""Cached samples, or None when prob_id was never fetched"""
+		try:
+			with open(self.cache_path(prob_id), "r", encoding="utf-8") as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return None
+
+	def store(self, prob_id, samples):
+		os.makedirs(self.cache_dir, exist_ok=True)
+		tmp_path = f"{self.cache_path(prob_id)}.tmp"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(samples, f)
+		os.replace(tmp_path, self.cache_path(prob_id))
+
+	def get(self, prob_id):
+		"""Sample tests of prob_id; raises the source's error when they aren't cached and can't be fetched"""
+		samples = self.cached(prob_id)
+		if samples is not None:
+			return samples
+		m = PROB_ID_RE.match(prob_id)
+		if not m:
+			raise ValueError(f"{prob_id} isn't a problem id")
+
+		# One fetch per problem even when a contest prefetch and a tab ask at the same time
+		with self.lock:
+			lock = self.fetching.setdefault(prob_id, threading.Lock())
+		with lock:
+			samples = self.cached(prob_id)
+			if samples is None:
+				samples = parse_samples(self.source.fetch(int(m.group(1)), m.group(2)))
+				# An empty result is most likely a changed or blocked page, don't cache it
+				if samples:
+					self.store(prob_id, samples)
+		return samples
+
+
+sample_fetcher = SampleFetcher()
@@ -0,0 +1,110 @@
+import os, re, json, subprocess, sys
+from repo_clone import widen_sparse_checkout
+
+# flat: {repo}/{probId}.{lang}
+# sharded: {repo}/{contestId // 100}/{contestId}/{index}.{lang}, keeps folders small in repos with thousands of solutions
+LAYOUTS = ("flat", "sharded")
+SHARD_SIZE = 100
+PROB_ID_RE = re.compile(r"^([0-9]+)([A-Z][1-9]*)$")
+USER_CONFIG_FILE = "user_config.json"
+
+
+def configured_layout(config_file=USER_CONFIG_FILE):
+	try:
+		with open(config_file, "r", encoding="utf-8") as f:
+			layout = json.load(f).get("layout", "flat")
+	except (OSError, ValueError, AttributeError):
+		return "flat"
+	return layout if layout in LAYOUTS else "flat"
+
+
+def relative_path(prob_id, lang, layout="flat"):
+	"""Solution path inside the repo, with forward slashes like git prints them"""
+	m = PROB_ID_RE.match(prob_id)
+	if layout != "sharded" or not m:
+		return f"{prob_id}.{lang}"
+	contest_id = int(m.group(1))
+	return f"{contest_id // SHARD_SIZE}/{contest_id}/{m.group(2)}.{lang}"
+
+
+def solution_path(repo_dir, prob_id, lang, layout="flat"):
+	"""Full path of a solution, creating its folder"""
+	path = os.path.join(repo_dir, *relative_path(prob_id, lang, layout).split("/"))
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	return path
+
+
+def repo_relative(repo_dir, path):
+	"""What gets passed to git add and stored in the contest queue"""
+	return os.path.relpath(path, repo_dir).replace(os.sep, "/")
+
+
+def problem_id(rel_path):
+	"""1900A from either 1900A.cpp or 19/1900/A.cpp"""
+	parts = rel_path.replace("\\", "/").split("/")
+	stem = os.path.splitext(parts[-1])[0]
+	if len(parts) > 1 and parts[-2].isdigit():
+		return f"{parts[-2]}{stem}"
+	return stem
+
+
+def migrate(repo_dir, contest_queue=None):
+	"""Move flat solutions into the sharded layout and commit the move, and nothing else, at once.
+	Queued contest solutions are renamed in contest_queue once the commit is in.
+	On a failure every file is moved back. Returns the number of files moved."""
+	def git(*args, paths=()):
+		# Paths go through stdin, thousands of them would overflow a Windows command line
+		return subprocess.run(["git", *args, "--pathspec-from-file=-", "--pathspec-file-nul"] if paths
+							  else ["git", *args], cwd=repo_dir, input="\0".join(paths),
+							  stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+	tracked = set(git("ls-files").stdout.splitlines())
+	planned = []
+	for name in sorted(os.listdir(repo_dir)):
+		stem, ext = os.path.splitext(name)
+		if not ext or not PROB_ID_RE.match(stem) or not os.path.isfile(os.path.join(repo_dir, name)):
+			continue
+		planned.append((name, relative_path(stem, ext[1:], "sharded")))
+	# git add refuses targets outside the checkout cone of a sparse clone
+	widen_sparse_checkout(repo_dir, [target for _, target in planned])
+
+	# One rename pass and a single add, a git mv per file means thousands of processes
+	moved = []
+	paths = [path for name, target in planned if name in tracked for path in (name, target)]
+	try:
+		for name, target in planned:
+			os.makedirs(os.path.join(repo_dir, os.path.dirname(target)), exist_ok=True)
+			os.replace(os.path.join(repo_dir, name), os.path.join(repo_dir, target))
+			moved.append((name, target))
+		if paths:
+			for args in (("add", "-A"), ("commit", "-m", "Move solutions into contest folders")):
+				result = git(*args, paths=paths)
+				if result.returncode:
+					raise RuntimeError(result.stdout.strip())
+	except Exception:
+		if paths:
+			git("reset", "-q", paths=paths)
+		for name, target in reversed(moved):
+			os.replace(os.path.join(repo_dir, target), os.path.join(repo_dir, name))
+		raise
+
+	if contest_queue is not None:
+		for name, target in moved:
+			contest_queue.rename(name, target)
+	return len(moved)
+
+
+def main():
+	"""python solution_layout.py: switch the configured solutions repo to the sharded layout"""
+	from contest_queue import contest_queue
+	with open(USER_CONFIG_FILE, "r", encoding="utf-8") as f:
+		cfg = json.load(f)
+	count = migrate(cfg["git_repo_name"], contest_queue)
+	cfg["layout"] = "sharded"
+	with open(USER_CONFIG_FILE, "w", encoding="utf-8") as f:
+		json.dump(cfg, f, indent=4)
+	print(f"Moved {count} solutions into contest folders, push to publish the move.")
+
+
+if __name__ == "__main__":
+	sys.exit(main())
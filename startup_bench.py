@@ -0,0 +1,80 @@
+"""Startup budget check for the GUI: python startup_bench.py, exits with 1 when over budget"""
+import os, re, subprocess, sys
+
+IMPORT_BUDGET_MS = 400
+FIRST_FRAME_BUDGET_MS = 1500
+# Loaded on first use only, importing the GUI must not pull these in
+DEFERRED_MODULES = ("requests", "urllib3", "multiprocessing")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IMPORTTIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)")
+
+FIRST_FRAME = """
+import time
+start = time.perf_counter()
+import cfmt_gui
+root = cfmt_gui.ttk.Window()
+cfmt_gui.CFMT_GUI(root, "startup_bench_repo", "startup_bench")
+root.update()
+print((time.perf_counter() - start) * 1000)
+root.destroy()
+"""
+
+
+def import_times(module):
+	"""Cumulative import time in ms of every module loaded by importing module in a fresh interpreter"""
+	result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+							cwd=HERE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+	if result.returncode != 0:
+		raise RuntimeError(result.stderr.strip().splitlines()[-1])
+	times = {}
+	for line in result.stderr.splitlines():
+		m = IMPORTTIME_RE.match(line)
+		if m:
+			times[m.group(2)] = int(m.group(1)) / 1000
+	return times
+
+
+def first_frame_ms():
+	"""Interpreter up to the first painted frame, None without a display"""
+	result = subprocess.run([sys.executable, "-c", FIRST_FRAME], cwd=HERE,
+							stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+	if result.returncode != 0:
+		if "TclError" in result.stderr:
+			return None
+		raise RuntimeError(result.stderr.strip().splitlines()[-1])
+	return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+	failures = []
+	try:
+		times = import_times("cfmt_gui")
+	except RuntimeError as e:
+		print(f"Couldn't import cfmt_gui: {e}")
+		return 1
+
+	print(f"import cfmt_gui: {times['cfmt_gui']:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+	for name, ms in sorted(times.items(), key=lambda kv: -kv[1])[1:6]:
+		print(f"  {name}: {ms:.1f} ms")
+	if times["cfmt_gui"] > IMPORT_BUDGET_MS:
+		failures.append("import time over budget")
+	eager = [m for m in DEFERRED_MODULES if m in times]
+	if eager:
+		failures.append(f"imported at startup: {', '.join(eager)}")
+
+	frame = first_frame_ms()
+	if frame is None:
+		print("first frame: skipped, no display")
+	else:
+		print(f"first frame: {frame:.1f} ms (budget {FIRST_FRAME_BUDGET_MS} ms)")
+		if frame > FIRST_FRAME_BUDGET_MS:
+			failures.append("first frame over budget")
+
+	for failure in failures:
+		print(f"FAIL: {failure}")
+	return 1 if failures else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,88 @@
+import os, time, random
+from concurrent.futures import FIRST_COMPLETED, wait
+from compile_cache import compile_cache
+from harness import run_solution, get_test_pool, solution_command, TIME_LIMIT, MEMORY_LIMIT_MB
+from checker import compare_output
+
+STRESS_CASES = 2000
+# Brute force solutions are slow by design, they get this much time per case
+BRUTE_TIME_LIMIT = 10.0
+PROGRESS_INTERVAL = 1.0
+
+
+def build_command(file_path):
+	"""Command running file_path, compiled first when it's C++"""
+	lang = os.path.splitext(file_path)[1].lstrip(".")
+	if lang == "cpp":
+		returncode, output, _ = compile_cache.compile(file_path)
+		if returncode != 0:
+			raise RuntimeError(f"{os.path.basename(file_path)} doesn't compile:\n{output}")
+	return solution_command(lang, file_path)
+
+
+def stress_case(gen_cmd, brute_cmd, sol_cmd, seed, time_limit, memory_limit_mb, eps):
+	"""One random case, returns None when the solution agrees with the brute force.
+	The generator gets the seed as its only argument, so every failure can be reproduced."""
+	gen = run_solution(gen_cmd + [str(seed)], time_limit=BRUTE_TIME_LIMIT)
+	if gen.verdict != "OK":
+		return {"seed": seed, "input": "", "error": f"generator {gen.summary()}\n{gen.stderr}"}
+	brute = run_solution(brute_cmd, gen.stdout, BRUTE_TIME_LIMIT, memory_limit_mb)
+	if brute.verdict != "OK":
+		return {"seed": seed, "input": gen.stdout, "error": f"brute force {brute.summary()}\n{brute.stderr}"}
+	sol = run_solution(sol_cmd, gen.stdout, time_limit, memory_limit_mb)
+	if sol.verdict == "OK":
+		ok, message = compare_output(brute.stdout, sol.stdout, eps)
+		if ok:
+			return None
+		sol.verdict, sol.message = "WA", message
+	return {"seed": seed, "input": gen.stdout, "expected": brute.stdout, "actual": sol.stdout,
+			"summary": sol.summary()}
+
+
+def stress(gen_cmd, brute_cmd, sol_cmd, cases=STRESS_CASES, time_limit=TIME_LIMIT,
+		   memory_limit_mb=MEMORY_LIMIT_MB, eps=None, on_progress=None, stop=None, pool=None):
+	"""Run up to `cases` random cases on pool, stopping at the first mismatch.
+	Returns (cases run, failure or None); of the failures found by the time the
+	in-flight cases finish, the one with the smallest input is returned.
+	on_progress(cases run, cases per second) is called about once a second,
+	stop is an optional threading.Event to cancel."""
+	pool = pool or get_test_pool()
+	in_flight = (os.cpu_count() or 2) * 2
+	seeds = iter(random.sample(range(1, 2 ** 31), cases))
+	pending = set()
+	failures = []
+	done_count = 0
+	start = last_report = time.monotonic()
+
+	def submit_next():
+		seed = next(seeds, None)
+		if seed is not None:
+			pending.add(pool.submit(stress_case, gen_cmd, brute_cmd, sol_cmd, seed,
+									time_limit, memory_limit_mb, eps))
+
+	for _ in range(in_flight):
+		submit_next()
+	while pending:
+		finished, _ = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+		for future in finished:
+			pending.discard(future)
+			# Cancelled when the app shuts the pool down on quit
+			if future.cancelled():
+				continue
+			done_count += 1
+			failure = future.result()
+			if failure is not None:
+				failures.append(failure)
+			elif not failures and not (stop and stop.is_set()):
+				submit_next()
+
+		now = time.monotonic()
+		if on_progress and now - last_report >= PROGRESS_INTERVAL:
+			on_progress(done_count, done_count / (now - start))
+			last_report = now
+
+	if on_progress:
+		on_progress(done_count, done_count / max(time.monotonic() - start, 1e-9))
+	if not failures:
+		return done_count, None
+	return done_count, min(failures, key=lambda f: len(f["input"]))
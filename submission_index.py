@@ -0,0 +1,106 @@
+import re, sqlite3, threading
+from contextlib import closing
+from cf_client import cf_client
+
+SUBMISSION_DB_FILE = "submissions.db"
+PAGE_SIZE = 100
+
+# Submissions still being judged get fetched again on the next sync.
+PENDING_VERDICTS = ("TESTING",)
+SOLVED_VERDICTS = ("OK", "PARTIAL")
+
+
+class SubmissionIndex:
+	"""Local SQLite copy of a user's submissions, synced incrementally by submission id"""
+	def __init__(self, path=SUBMISSION_DB_FILE):
+		self.path = path
+		self.lock = threading.Lock()
+		self.created = False
+
+	def connect(self):
+		"""The database is only created on first use, so importing this module touches no files"""
+		db = sqlite3.connect(self.path, timeout=10)
+		if not self.created:
+			with db:
+				db.execute(
+					"CREATE TABLE IF NOT EXISTS submissions ("
+					"id INTEGER PRIMARY KEY, handle TEXT NOT NULL, contest_id INTEGER, "
+					"problem_index TEXT, verdict TEXT, participant_type TEXT, creation_time INTEGER)"
+				)
+				db.execute(
+					"CREATE INDEX IF NOT EXISTS submissions_problem "
+					"ON submissions (handle, contest_id, problem_index)"
+				)
+			self.created = True
+		return db
+
+	def watermark(self, db, handle):
+		"""Everything above this id has to be fetched again"""
+		pending = db.execute(
+			f"SELECT MIN(id) FROM submissions WHERE handle = ? "
+			f"AND (verdict IS NULL OR verdict IN ({','.join('?' * len(PENDING_VERDICTS))}))",
+			(handle, *PENDING_VERDICTS)
+		).fetchone()[0]
+		if pending is not None:
+			return pending - 1
+		return db.execute("SELECT MAX(id) FROM submissions WHERE handle = ?", (handle,)).fetchone()[0]
+
+	@staticmethod
+	def to_row(handle, s):
+		return (
+			s["id"], handle, s["problem"].get("contestId"), s["problem"].get("index"),
+			s.get("verdict"), s["author"].get("participantType"), s.get("creationTimeSeconds"),
+		)
+
+	def fetch_new(self, handle, watermark):
+		"""Page through user.status newest first until reaching known submissions"""
+		if watermark is None:
+			data = cf_client.call("user.status", {"handle": handle})
+			return data["result"] if data["status"] == "OK" else []
+
+		fresh = []
+		start = 1
+		while True:
+			data = cf_client.call("user.status", {"handle": handle, "from": start, "count": PAGE_SIZE})
+			if data["status"] != "OK":
+				break
+			page = data["result"]
+			for s in page:
+				if s["id"] <= watermark:
+					return fresh
+				fresh.append(s)
+			if len(page) < PAGE_SIZE:
+				break
+			start += PAGE_SIZE
+		return fresh
+
+	def sync(self, handle):
+		"""Store submissions newer than the ones already indexed, returns how many were fetched"""
+		with self.lock:
+			with closing(self.connect()) as db:
+				watermark = self.watermark(db, handle)
+			fresh = self.fetch_new(handle, watermark)
+			if fresh:
+				with closing(self.connect()) as db, db:
+					db.executemany(
+						"INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?)",
+						(self.to_row(handle, s) for s in fresh)
+					)
+			return len(fresh)
+
+	def contest_solve(self, handle, prob_id):
+		"""Contest id if prob_id was solved as CONTESTANT, otherwise None"""
+		m = re.match(r"^([0-9]+)([A-Z][1-9]*)$", prob_id)
+		if not m:
+			return None
+		with closing(self.connect()) as db:
+			row = db.execute(
+				f"SELECT contest_id FROM submissions WHERE handle = ? AND contest_id = ? "
+				f"AND problem_index = ? AND participant_type = 'CONTESTANT' "
+				f"AND verdict IN ({','.join('?' * len(SOLVED_VERDICTS))}) LIMIT 1",
+				(handle, int(m.group(1)), m.group(2), *SOLVED_VERDICTS)
+			).fetchone()
+		return row[0] if row else None
+
+
+submission_index = SubmissionIndex()